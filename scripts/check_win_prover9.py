@@ -13,86 +13,136 @@ State JSON format (example):
   "time": "n1"
 }
 
-The script writes a temporary .in with the provided facts + win axioms and queries
+Both win predicates are decided directly from `alive`/`roles` unless the state
+sets "force_solver": true (or --force-solver is passed), in which case the
+solver is asked instead.
+
+The script builds a .in text with the provided facts + win axioms and queries
 `villagersWin(<time>)` and `mafiaWin(<time>)`. It uses `scripts.mace4_query` if
-available; otherwise it attempts to call `mace4` on PATH.
+available; otherwise it attempts to call `mace4` on PATH (resolved once per
+process). The text is kept in memory and never written to a temp file by this
+script.
 """
 
 import argparse
+import functools
 import json
 import os
-import tempfile
-import textwrap
+import re
+import shutil
 from pathlib import Path
 import subprocess
 import sys
 
-try:
-    import scripts.mace4_query as mq
-except Exception:
-    mq = None
+# scripts.mace4_query is imported on first use by _get_mq(), so plain CLI runs
+# and the direct Python check don't pay for it.
+_mq = None
+_mq_loaded = False
 
 
-def build_in_content(state):
-    players = state.get('players', [])
+def _get_mq():
+    """Return the scripts.mace4_query module, or None if it can't be imported."""
+    global _mq, _mq_loaded
+    if not _mq_loaded:
+        try:
+            import scripts.mace4_query as mq
+        except Exception:
+            mq = None
+        _mq = mq
+        _mq_loaded = True
+    return _mq
+
+# Fact predicate for each role.
+ROLE_PRED = {'mafia': 'isMafia', 'doctor': 'isDoctor', 'cop': 'isCop', 'villager': 'isVillager'}
+
+# Role codes used by encode_state; _ROLE_FACTS is ROLE_PRED indexed by code.
+MAFIA, DOCTOR, COP, VILLAGER, UNKNOWN = range(5)
+ROLE_IDS = {'mafia': MAFIA, 'doctor': DOCTOR, 'cop': COP, 'villager': VILLAGER}
+_ROLE_FACTS = tuple(ROLE_PRED[r] for r in ROLE_IDS)
+
+# Win axioms, the same for every state (generate_prover9 emits the same block).
+_WIN_AXIOMS = (
+    # Villagers win: no mafia alive at time N
+    '% Villagers win: no mafia alive at time N\n'
+    'all N ( ( all P ( isMafia(P) -> -alive(P,N) ) ) -> villagersWin(N) ).\n'
+    # Mafia win: all alive players are mafia at N (sufficient condition)
+    '% Mafia win: all alive players are mafia at time N (sufficient condition)\n'
+    'all N ( ( all P ( -alive(P,N) -> isMafia(P) ) ) -> mafiaWin(N) ).\n'
+)
+
+# Layout of the generated .in; str.format placeholders because the Prover9
+# comment character is '%'. The axiom block is spliced in once, at import.
+_IN_TEMPLATE = (
+    '% Auto-generated check_win .in\n'
+    'formulas(assumptions).\n'
+    '{role_facts}\n'
+    '\n'
+    '{alive_facts}\n'
+    '\n'
+    + _WIN_AXIOMS
+    + 'end.\n'
+    '\n'
+    'formulas(goals).\n'
+    '% queries will be asserted by the runner\n'
+    'end.\n'
+)
+
+# Heuristic markers of a found model in raw mace4 output; one scan, no lower().
+_SAT_RE = re.compile(r'model found|instance found|satisfiable', re.I)
+
+
+
+def encode_state(state):
+    """Split a state dict into parallel arrays, one entry per player.
+
+    Returns (players, role_ids, alive_mask, time) where `role_ids` holds one
+    role code per player and `alive_mask` one 0/1 flag per player, both as
+    bytes so they are compact, hashable and searchable in C.
+    """
+    players = tuple(state.get('players', []))
     roles = state.get('roles', {})
     alive = set(state.get('alive', []))
-    time = state.get('time', 'n1')
-    lines = []
-    lines.append('% Auto-generated check_win .in')
-    lines.append('formulas(assumptions).')
-
-    # role facts
-    for p in players:
-        r = roles.get(p)
-        if r == 'mafia':
-            lines.append(f'isMafia({p}).')
-        elif r == 'doctor':
-            lines.append(f'isDoctor({p}).')
-        elif r == 'cop':
-            lines.append(f'isCop({p}).')
-        elif r == 'villager':
-            lines.append(f'isVillager({p}).')
-
-    lines.append('')
-    # alive facts at requested time
-    for p in alive:
-        lines.append(f'alive({p},{time}).')
-
-    lines.append('')
-    # Win axioms: villagersWin(N) if no mafia alive at N
-    lines.append('% Villagers win: no mafia alive at time N')
-    lines.append('all N ( ( all P ( isMafia(P) -> -alive(P,N) ) ) -> villagersWin(N) ).')
-    # Mafia win: all alive players are mafia at N (sufficient condition)
-    lines.append('% Mafia win: all alive players are mafia at time N (sufficient condition)')
-    lines.append('all N ( ( all P ( -alive(P,N) -> isMafia(P) ) ) -> mafiaWin(N) ).')
+    role_ids = bytes(ROLE_IDS.get(roles.get(p), UNKNOWN) for p in players)
+    alive_mask = bytes(p in alive for p in players)
+    return players, role_ids, alive_mask, state.get('time', 'n1')
 
-    lines.append('end.')
-    lines.append('')
-    lines.append('formulas(goals).')
-    lines.append("% queries will be asserted by the runner")
-    lines.append('end.')
 
-    return '\n'.join(lines) + '\n'
+def build_in_content(state):
+    """Return the .in text (role/alive facts + win axioms) for a state dict.
+
+    The state is encoded into parallel arrays (see encode_state), which also
+    serve as the cache key, so repeated states -- common while searching a
+    game tree -- are served from a cache.
+    """
+    return _build_cached(*encode_state(state))
 
 
-def run_mace_query_via_subprocess(infile_path: Path, query: str):
-    """Fallback: write query file and call mace4 on PATH. Returns (rc, stdout)."""
-    # We'll append a temporary goals section with the query.
-    with open(infile_path, 'r') as f:
-        base = f.read()
+@functools.lru_cache(maxsize=4096)
+def _build_cached(players, role_ids, alive_mask, time):
+    role_facts = '\n'.join([f'{_ROLE_FACTS[r]}({p}).' for p, r in zip(players, role_ids) if r != UNKNOWN])
+    alive_facts = '\n'.join([f'alive({p},{time}).' for p, a in zip(players, alive_mask) if a])
+    return _IN_TEMPLATE.format(role_facts=role_facts, alive_facts=alive_facts)
 
-    tmpq = infile_path.with_suffix('.q.in')
-    with open(tmpq, 'w') as f:
-        f.write(base)
-        f.write('\n')
-        f.write('formulas(goals).\n')
-        f.write(query + '.\n')
-        f.write('end.\n')
 
+def run_mace_query(content, query: str, mace4_cmd: str = 'mace4'):
+    """Fallback: pipe the assumptions plus a goals section with the query to mace4. Returns (rc, stdout).
+
+    `content` is the assumption text, either as str or already encoded to bytes.
+    """
+    if isinstance(content, str):
+        content = content.encode()
+    goals = ('\nformulas(goals).\n' + query + '.\nend.\n').encode()
     try:
-        p = subprocess.run(['mace4', str(tmpq)], capture_output=True, text=True, timeout=30)
-        out = p.stdout + '\n' + p.stderr
+        # binary pipes with full buffering; decode the output once at the end
+        p = subprocess.Popen([mace4_cmd], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                             stderr=subprocess.PIPE, bufsize=-1)
+        try:
+            stdout, stderr = p.communicate(content + goals, timeout=30)
+        except subprocess.TimeoutExpired as e:
+            p.kill()
+            p.communicate()
+            return 1, str(e)
+        out = (stdout + b'\n' + stderr).decode(errors='replace')
         rc = p.returncode
     except FileNotFoundError:
         out = 'mace4 not found on PATH'
@@ -100,18 +150,20 @@ def run_mace_query_via_subprocess(infile_path: Path, query: str):
     except Exception as e:
         out = str(e)
         rc = 1
-    finally:
-        try:
-            tmpq.unlink()
-        except Exception:
-            pass
     return rc, out
 
 
+@functools.lru_cache(maxsize=None)
+def which(cmd: str):
+    """shutil.which, cached so PATH is searched once per command."""
+    return shutil.which(cmd)
+
+
 def main():
     ap = argparse.ArgumentParser(description='Check win conditions using Prover9/Mace4 for a given game state')
     ap.add_argument('--state', '-s', help='JSON file with state (players, roles, alive, time)')
     ap.add_argument('--inline', '-i', help='Inline JSON string for state (alternative to --state)')
+    ap.add_argument('--force-solver', action='store_true', help='Always run Mace4 instead of the direct Python check')
     args = ap.parse_args()
 
     if not args.state and not args.inline:
@@ -126,64 +178,48 @@ def main():
         state = json.loads(p.read_text())
     else:
         state = json.loads(args.inline)
+    if args.force_solver:
+        state['force_solver'] = True
 
-    content = build_in_content(state)
+    print(win_message(check_state(state)))
+    sys.exit(0)
 
-    # write temp .in
-    with tempfile.NamedTemporaryFile('w', suffix='.in', delete=False) as tf:
-        tmp_path = Path(tf.name)
-        tf.write(content)
 
-    try:
-        time = state.get('time', 'n1')
-        queries = [f'villagersWin({time})', f'mafiaWin({time})']
-        results = {}
-
-        for q in queries:
-            if mq is not None:
-                try:
-                    rc, out, parsed = mq.run_query_return(tmp_path, q)
-                except Exception as e:
-                    rc, out = 1, str(e)
-                    parsed = None
-                # if rc == 0 and parsed -> model found containing the predicate
-                results[q] = (rc, parsed is not None and bool(parsed))
-            else:
-                rc, out = run_mace_query_via_subprocess(tmp_path, q)
-                # heuristic: if output contains 'Model found' or 'Instance found' treat as true
-                lower = out.lower() if out else ''
-                sat = ('model found' in lower) or ('instance found' in lower) or ('satisfiable' in lower)
-                results[q] = (rc, sat)
-
-        # Interpret results
-        vill = results.get(f'villagersWin({time})', (1, False))[1]
-        mafi = results.get(f'mafiaWin({time})', (1, False))[1]
+def win_message(res: dict) -> str:
+    """One-line verdict for a check_state() result, naming how it was decided.
 
+    "(model found)" is only claimed when Mace4 actually ran, i.e. `results`
+    is non-empty; otherwise the verdict came from the alive counts.
+    """
+    vill = res.get('villagers')
+    mafi = res.get('mafia')
+    if res.get('results'):
         if vill and not mafi:
-            print('Villagers win (model found)')
-            code = 0
-        elif mafi and not vill:
-            print('Mafia win (model found)')
-            code = 0
-        elif mafi and vill:
-            print('Both win predicates satisfiable (ambiguous)')
-            code = 0
-        else:
-            print('No winner yet (no model found for win predicates)')
-            code = 0
-
-    finally:
-        try:
-            if tmp_path.exists():
-                tmp_path.unlink()
-        except Exception:
-            pass
-
-    sys.exit(code)
-
-
-if __name__ == '__main__':
-    main()
+            return 'Villagers win (model found)'
+        if mafi and not vill:
+            return 'Mafia win (model found)'
+        if mafi and vill:
+            return 'Both win predicates satisfiable (ambiguous)'
+        return 'No winner yet (no model found for win predicates)'
+    if vill and not mafi:
+        return 'Villagers win (no Mafia alive)'
+    if mafi and not vill:
+        return 'Mafia win (only Mafia alive)'
+    if mafi and vill:
+        return 'Both win predicates hold (nobody alive)'
+    return 'No winner yet (decided from alive counts)'
+
+
+def _run_mq_query(mq, infile, query: str):
+    """Run one query through scripts.mace4_query. Returns (rc, parsed_model_or_None).
+
+    `infile` is a path or a handle from mq.prepare()/mq.prepare_text().
+    """
+    try:
+        rc, out, parsed = mq.run_query_return(infile, query)
+    except Exception:
+        return 1, None
+    return rc, parsed
 
 
 def check_state(state: dict):
@@ -195,43 +231,67 @@ def check_state(state: dict):
       'mafia': bool,
       'results': {query: (rc, sat_bool)},
     }
-    """
-    content = build_in_content(state)
-    with tempfile.NamedTemporaryFile('w', suffix='.in', delete=False) as tf:
-        tmp_path = Path(tf.name)
-        tf.write(content)
 
-    try:
-        time = state.get('time', 'n1')
-        queries = [f'villagersWin({time})', f'mafiaWin({time})']
-        results = {}
+    Unless state['force_solver'] is true, the win predicates are computed
+    directly from the state (no mafia alive / all alive are mafia) and
+    'results' is empty. Degenerate states -- nobody alive (both predicates
+    hold vacuously), no mafia alive, or only mafia alive -- are always
+    answered directly, even with 'force_solver'.
+    """
+    players, role_ids, alive_mask, time = encode_state(state)
+    alive_roles = bytes(r for r, a in zip(role_ids, alive_mask) if a)
+    mafia_alive = alive_roles.count(MAFIA)
+    villagers_win = mafia_alive == 0
+    mafia_win = mafia_alive == len(alive_roles)
+    if villagers_win or mafia_win or not state.get('force_solver'):
+        return {
+            'time': time,
+            'villagers': villagers_win,
+            'mafia': mafia_win,
+            'results': {},
+        }
 
+    content = build_in_content(state)
+    queries = [f'villagersWin({time})', f'mafiaWin({time})']
+    results = {}
+
+    mq = _get_mq()
+    if mq is not None:
+        # hand the assumptions to the helper in memory, scanned once for all queries
+        infile = mq.prepare_text(content)
+        # One Mace4 run for the disjunction of both goals; the model it
+        # returns tells us which predicate holds. Only a goal the model
+        # leaves false needs its own run.
+        rc, parsed = _run_mq_query(mq, infile, ' | '.join(queries))
+        found = rc == 0 and parsed is not None and bool(parsed)
+        for q, pred in zip(queries, ('villagersWin', 'mafiaWin')):
+            if not found:
+                results[q] = (rc, False)
+            elif mq.relation_holds(parsed, pred, (time,)):
+                results[q] = (rc, True)
+            else:
+                q_rc, q_parsed = _run_mq_query(mq, infile, q)
+                results[q] = (q_rc, q_rc == 0 and q_parsed is not None and bool(q_parsed))
+    else:
+        # the subprocess fallback streams `content` straight to mace4's stdin
+        exe = which('mace4')
+        content_bytes = content.encode()
         for q in queries:
-            if mq is not None:
-                try:
-                    rc, out, parsed = mq.run_query_return(tmp_path, q)
-                except Exception as e:
-                    rc, out = 1, str(e)
-                    parsed = None
-                sat = (rc == 0 and parsed is not None and bool(parsed))
-                results[q] = (rc, sat)
+            if exe is None:
+                rc, out = 127, 'mace4 not found on PATH'
             else:
-                rc, out = run_mace_query_via_subprocess(tmp_path, q)
-                lower = out.lower() if out else ''
-                sat = ('model found' in lower) or ('instance found' in lower) or ('satisfiable' in lower)
-                results[q] = (rc, sat)
+                rc, out = run_mace_query(content_bytes, q, exe)
+            results[q] = (rc, bool(out) and _SAT_RE.search(out) is not None)
+
+    vill = results.get(f'villagersWin({time})', (1, False))[1]
+    mafi = results.get(f'mafiaWin({time})', (1, False))[1]
+    return {
+        'time': time,
+        'villagers': vill,
+        'mafia': mafi,
+        'results': results,
+    }
 
-        vill = results.get(f'villagersWin({time})', (1, False))[1]
-        mafi = results.get(f'mafiaWin({time})', (1, False))[1]
-        return {
-            'time': time,
-            'villagers': vill,
-            'mafia': mafi,
-            'results': results,
-        }
-    finally:
-        try:
-            if tmp_path.exists():
-                tmp_path.unlink()
-        except Exception:
-            pass
+
+if __name__ == '__main__':
+    main()
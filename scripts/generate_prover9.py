@@ -13,7 +13,44 @@ Elimination is then asserted as `-Alive(player, next_night)` in the produced `.i
 
 import json
 import os
-from collections import Counter, defaultdict
+from collections import defaultdict
+from pathlib import Path
+
+# Fact predicate emitted for each role
+ROLE_PRED = {'mafia': 'isMafia', 'doctor': 'isDoctor', 'cop': 'isCop', 'villager': 'isVillager'}
+
+# Win condition predicates (simple, time-indexed); identical to the block
+# check_win_prover9 builds its .in files with
+_WIN_AXIOMS = (
+    # Villagers win at time N if no mafia is alive at N
+    '% Villagers win: no mafia alive at time N\n'
+    'all N ( ( all P ( isMafia(P) -> -alive(P,N) ) ) -> villagersWin(N) ).\n'
+    # Mafia win at time N if all alive players are mafia (i.e., no non-mafia alive)
+    '% Mafia win: all alive players are mafia at time N (sufficient condition)\n'
+    'all N ( ( all P ( -alive(P,N) -> isMafia(P) ) ) -> mafiaWin(N) ).\n'
+)
+
+# Everything after the scenario facts: axioms, win predicates, goals
+_AXIOMS_AND_GOALS = (
+    "% Axioms\n"
+    # Protect leads to Protected at same night
+    "all D all Y all N ( protect(D,Y,N) -> protected(Y,N) ).\n"
+    # Kill without Protected causes death at next time. `next` is a function,
+    # so the axiom needs no fourth variable for the following night and
+    # Mace4 grounds a factor of domain-size fewer instances.
+    "all X all Y all N ( kill(X,Y,N) & -protected(Y,N) -> -alive(Y,next(N)) ).\n"
+    # Investigate outcome
+    "all C all T all N ( isCop(C) & isMafia(T) & investigate(C,T,N) -> recognizes(C,T) ).\n"
+    "\n"
+    + _WIN_AXIOMS
+    # (persistence axiom removed — previously used nested negation that caused
+    # Mace4 to complain about symbol usage conflicts; keeping axioms minimal)
+    + "end.\n\n"
+    # Goals: for convenience we assert no specific goal; user can add queries to prove
+    "formulas(goals).\n"
+    "% Add goals here, e.g. -Alive(e,n1) or Recognizes(c,a).\n"
+    "end.\n"
+)
 
 OUT_PATH = os.path.join(os.path.dirname(__file__), '..', 'prover9', 'multi_night_example.in')
 
@@ -70,115 +107,96 @@ def time_const(i):
     return f"n{i}"
 
 
-def write_in(path, scenario):
+def build_in_text(scenario):
+    """Return the Prover9/Mace4 input for `scenario` as a string."""
     players = scenario["players"]
     roles = scenario.get("roles", {})
     nights = int(scenario.get("nights", 1))
     night_actions = scenario.get("night_actions", {})
     day_votes = scenario.get("day_votes", {})
+    # time constants n0..n{nights}, formatted once
+    times = [time_const(i) for i in range(nights + 1)]
 
     # compute which players are eliminated by votes (generator handles tallying)
     eliminated_by_day = {}
     for day_str, votes in day_votes.items():
-        day = int(day_str)
-        cnt = Counter([v["target"] for v in votes])
-        if not cnt:
-            continue
-        most_common = cnt.most_common()
-        top_count = most_common[0][1]
-        top = [p for p, c in most_common if c == top_count]
-        if len(top) == 1:
-            eliminated_by_day[day] = top[0]
-
-    with open(path, 'w') as f:
-        f.write("% Auto-generated Prover9 input: multi-night Mafia example\n")
-        f.write("% Nights: {}\n\n".format(nights))
-
-        # assumptions
-        f.write("formulas(assumptions).\n")
-
-        # role facts
-        for p in players:
-            r = roles.get(p)
-            if r == 'mafia':
-                f.write(f"isMafia({p}).\n")
-            elif r == 'doctor':
-                f.write(f"isDoctor({p}).\n")
-            elif r == 'cop':
-                f.write(f"isCop({p}).\n")
-            elif r == 'villager':
-                f.write(f"isVillager({p}).\n")
-            else:
-                # unspecified role — leave it out
-                pass
-
-        f.write('\n')
-
-        # time constants and Next relation
-        for i in range(nights + 1):
-            f.write(f"% time constant\n")
-            f.write(f"% {time_const(i)}\n")
-        f.write('\n')
-        for i in range(nights):
-            f.write(f"next({time_const(i)},{time_const(i+1)}).\n")
-        f.write('\n')
-
-        # Alive at initial night n0
-        for p in players:
-            f.write(f"alive({p},{time_const(0)}).\n")
-        f.write('\n')
-
-        # Night actions
-        for i in range(nights):
-            acts = night_actions.get(str(i), [])
-            for act in acts:
-                typ = act.get('type')
-                by = act.get('by')
-                target = act.get('target')
-                if typ == 'kill':
-                    f.write(f"kill({by},{target},{time_const(i)}).\n")
-                elif typ == 'protect':
-                    f.write(f"protect({by},{target},{time_const(i)}).\n")
-                elif typ == 'investigate':
-                    f.write(f"investigate({by},{target},{time_const(i)}).\n")
-            f.write('\n')
-
-        # Day eliminations (generator computed)
-        for day, player in eliminated_by_day.items():
-            # day corresponds to after night `day` -> which is time_const(day+1)
-            t = time_const(day+1)
-            f.write(f"% elimination by vote on day {day}\n")
-            f.write(f"eliminated({player},{t}).\n")
-            # assert explicitly not alive at that time — we do this on generator side
-            f.write(f"-alive({player},{t}).\n")
-            f.write('\n')
-
-        # Axioms (time-indexed)
-        f.write("% Axioms\n")
-        # Protect leads to Protected at same night
-        f.write("all D all Y all N ( protect(D,Y,N) -> protected(Y,N) ).\n")
-        # Kill without Protected causes death at next time (quantify M = next time)
-        f.write("all X all Y all N all M ( kill(X,Y,N) & -protected(Y,N) & next(N,M) -> -alive(Y,M) ).\n")
-        # Investigate outcome
-        f.write("all C all T all N ( isCop(C) & isMafia(T) & investigate(C,T,N) -> recognizes(C,T) ).\n")
-        f.write('\n')
-        # Win condition predicates (simple, time-indexed)
-        # Villagers win at time N if no mafia is alive at N
-        f.write('% Villagers win: no mafia alive at time N\n')
-        f.write('all N ( ( all P ( isMafia(P) -> -alive(P,N) ) ) -> villagersWin(N) ).\n')
-        # Mafia win at time N if all alive players are mafia (i.e., no non-mafia alive)
-        f.write('% Mafia win: all alive players are mafia at time N (sufficient condition)\n')
-        f.write('all N ( ( all P ( -alive(P,N) -> isMafia(P) ) ) -> mafiaWin(N) ).\n')
-        # (persistence axiom removed — previously used nested negation that caused
-        # Mace4 to complain about symbol usage conflicts; keeping axioms minimal)
-
-        f.write("end.\n\n")
-
-        # Goals: for convenience we assert no specific goal; user can add queries to prove
-        f.write("formulas(goals).\n")
-        f.write("% Add goals here, e.g. -Alive(e,n1) or Recognizes(c,a).\n")
-        f.write("end.\n")
+        # single pass: track the leading target and whether the lead is tied
+        best_c, best_t, tie = 0, None, False
+        tally = {}
+        for v in votes:
+            t = v["target"]
+            c = tally[t] = tally.get(t, 0) + 1
+            if c > best_c:
+                best_c, best_t, tie = c, t, False
+            elif c == best_c:
+                tie = True
+        if best_t is not None and not tie:
+            eliminated_by_day[int(day_str)] = best_t
+
+    parts = []
+    parts.append("% Auto-generated Prover9 input: multi-night Mafia example\n")
+    parts.append("% Nights: {}\n\n".format(nights))
+
+    # assumptions
+    parts.append("formulas(assumptions).\n")
+
+    # role facts
+    for p in players:
+        pred = ROLE_PRED.get(roles.get(p))
+        # unspecified role — leave it out
+        if pred:
+            parts.append(f"{pred}({p}).\n")
+
+    parts.append('\n')
+
+    # time constants and the successor function next(N)
+    for i in range(nights + 1):
+        parts.append(f"% time constant\n")
+        parts.append(f"% {times[i]}\n")
+    parts.append('\n')
+    for i in range(nights):
+        parts.append(f"next({times[i]}) = {times[i+1]}.\n")
+    parts.append('\n')
+
+    # Alive at initial night n0
+    for p in players:
+        parts.append(f"alive({p},{times[0]}).\n")
+    parts.append('\n')
+
+    # Night actions
+    for i in range(nights):
+        acts = night_actions.get(str(i), [])
+        for act in acts:
+            typ = act.get('type')
+            by = act.get('by')
+            target = act.get('target')
+            if typ == 'kill':
+                parts.append(f"kill({by},{target},{times[i]}).\n")
+            elif typ == 'protect':
+                parts.append(f"protect({by},{target},{times[i]}).\n")
+            elif typ == 'investigate':
+                parts.append(f"investigate({by},{target},{times[i]}).\n")
+        parts.append('\n')
+
+    # Day eliminations (generator computed)
+    for day, player in eliminated_by_day.items():
+        # day corresponds to after night `day` -> which is time_const(day+1);
+        # votes may be recorded past the last simulated night, so don't index `times`
+        t = time_const(day+1)
+        parts.append(f"% elimination by vote on day {day}\n")
+        parts.append(f"eliminated({player},{t}).\n")
+        # assert explicitly not alive at that time — we do this on generator side
+        parts.append(f"-alive({player},{t}).\n")
+        parts.append('\n')
+
+    # Axioms, win predicates and the empty goals section are the same for
+    # every scenario
+    parts.append(_AXIOMS_AND_GOALS)
+    return ''.join(parts)
+
 
+def write_in(path, scenario):
+    Path(path).write_text(build_in_text(scenario))
     print(f"Wrote {path}")
 
 
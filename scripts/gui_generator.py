@@ -22,8 +22,14 @@ from datetime import datetime
 from tkinter import filedialog
 from pathlib import Path
 import sys
+import subprocess
 import tempfile
 import json
+import hashlib
+import queue
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Ensure repository root is on sys.path so `import scripts.*` works when running
 # the script from the repository root or elsewhere.
@@ -31,20 +37,70 @@ repo_root = Path(__file__).resolve().parents[1]
 if str(repo_root) not in sys.path:
     sys.path.insert(0, str(repo_root))
 
+# where generated .in files go; resolved once instead of on every write
+PROVER9_DIR = repo_root / 'prover9'
+try:
+    PROVER9_DIR.mkdir(parents=True, exist_ok=True)
+except OSError:
+    pass
+
 try:
     import scripts.mace4_query as mq
 except Exception:
     mq = None
 
+try:
+    import scripts.check_win_prover9 as cw
+except Exception:
+    cw = None
+
 # import the generator function
 try:
-    from scripts.generate_prover9 import write_in
+    from scripts.generate_prover9 import build_in_text, write_in
 except Exception as e:
-    write_in = None
+    build_in_text = write_in = None
     IMPORT_ERROR = e
 else:
     IMPORT_ERROR = None
 
+# one line of the Prover9 win-check summary
+_fmt_win_result = '{q}: {v} (rc={rc})'.format
+
+# rank of each role as a mafia kill target (lower first); unlisted roles rank 2
+KILL_PRIORITY = {'cop': 0, 'doctor': 1}
+
+# player names and n0..nN time lists, built once instead of per widget/generate
+ALPHABET = tuple(string.ascii_lowercase)
+ALPHABET_LIST = list(ALPHABET)
+TIMES_CACHE = {n: [f'n{i}' for i in range(n + 1)] for n in range(1, 11)}
+
+# Mace4 results from on_suggest, keyed by (scenario fingerprint, query).
+# Cleared whenever the scenario changes; bounded so long sessions don't grow it.
+_MACE_CACHE_MAX = 256
+_mace_cache = OrderedDict()
+_mace_cache_lock = threading.Lock()
+
+
+def open_in_editor(path):
+    """Open `path` with the platform's default application without waiting."""
+    if sys.platform == 'darwin':
+        subprocess.Popen(['open', path])
+    elif sys.platform.startswith('win'):
+        os.startfile(path)
+    else:
+        subprocess.Popen(['xdg-open', path])
+
+
+def with_night_action(scen, night_key, action):
+    """Return `scen` with `action` added to night `night_key`.
+
+    Only the night_actions mapping and that night's list are new; players,
+    roles, votes and the other nights are shared with `scen`, so callers
+    must treat the result as read-only (the what-if simulations do).
+    """
+    na = scen.get('night_actions', {})
+    return {**scen, 'night_actions': {**na, night_key: list(na.get(night_key, ())) + [action]}}
+
 
 def default_role_counts(n):
     # simple heuristic: 1 mafia per 4 players, at least 1; 1 doctor, 1 cop if enough players
@@ -54,6 +110,15 @@ def default_role_counts(n):
     return mafia, doctor, cop
 
 
+def vote_leader(votes):
+    """Return the target with strictly the most `votes`, or None on a tie."""
+    # the leader is unique iff the runner-up (if any) has fewer votes
+    most = Counter(v['target'] for v in votes).most_common(2)
+    if len(most) == 1 or most[0][1] > most[1][1]:
+        return most[0][0]
+    return None
+
+
 class GeneratorGUI(tk.Tk):
     def __init__(self):
         super().__init__()
@@ -97,26 +162,60 @@ class GeneratorGUI(tk.Tk):
         frame = ttk.Frame(canvas, padding=12)
         canvas.create_window((0, 0), window=frame, anchor='nw')
 
-        # update scrollregion when the inner frame changes size
+        # update scrollregion when the inner frame changes size; the frame is
+        # the only canvas item (anchored at 0,0), so its size is the region
+        self._last_scrollregion = None
+
         def _on_frame_configure(event):
+            region = (0, 0, event.width, event.height)
+            if region == self._last_scrollregion:
+                return
+            self._last_scrollregion = region
             try:
-                canvas.configure(scrollregion=canvas.bbox("all"))
+                canvas.configure(scrollregion=region)
             except Exception:
                 pass
 
         frame.bind('<Configure>', _on_frame_configure)
 
         # mousewheel support (basic): works on macOS/Windows (event.delta)
+        # Wheel ticks are summed and applied at most once per frame (~16 ms),
+        # so precision wheels/trackpads don't force a redraw per event.
+        self._wheel_accum = 0
+        self._wheel_after = None
+
+        def _flush_wheel():
+            self._wheel_after = None
+            delta, self._wheel_accum = self._wheel_accum, 0
+            if delta:
+                canvas.yview_scroll(delta, 'units')
+
+        canvas_path = str(canvas)
+
         def _on_mousewheel(event):
+            # only scroll the form for the wheel over the canvas or its children;
+            # popups (suggestions, model view) and widgets that scroll
+            # themselves keep the wheel to themselves
+            widget_path = str(event.widget)
+            if widget_path != canvas_path and not widget_path.startswith(canvas_path + '.'):
+                return
+            try:
+                if event.widget.winfo_class() in ('TSpinbox', 'TCombobox', 'Listbox', 'Text'):
+                    return
+            except Exception:
+                pass
             # Normalize delta (event.delta is multiple of 120 on many systems)
             try:
                 delta = int(-1 * (event.delta // 120))
             except Exception:
                 # fallback for unusual delta values
                 delta = -1 if getattr(event, 'delta', 0) > 0 else 1
-            canvas.yview_scroll(delta, 'units')
+            self._wheel_accum += delta
+            if self._wheel_after is None:
+                self._wheel_after = self.after(16, _flush_wheel)
 
-        # bind to the canvas so wheel anywhere scrolls
+        # <MouseWheel> goes to the widget under the pointer, not the canvas,
+        # so listen application-wide and filter in _on_mousewheel
         canvas.bind_all('<MouseWheel>', _on_mousewheel)
 
         # number of players
@@ -164,7 +263,7 @@ class GeneratorGUI(tk.Tk):
 
         ttk.Label(frame, text='Player (a):').grid(row=10, column=0, sticky='w')
         self.player_var = tk.StringVar(value='a')
-        self.player_spin = ttk.Spinbox(frame, values=list(string.ascii_lowercase), textvariable=self.player_var, width=5)
+        self.player_spin = ttk.Spinbox(frame, values=ALPHABET_LIST, textvariable=self.player_var, width=5)
         self.player_spin.grid(row=10, column=1, sticky='w')
 
         ttk.Label(frame, text='Time:').grid(row=11, column=0, sticky='w')
@@ -189,8 +288,62 @@ class GeneratorGUI(tk.Tk):
         # status
         self.status = ttk.Label(frame, text='')
         self.status.grid(row=7, column=0, columnspan=2, sticky='w')
+        # Night, Players and Day panels are only usable once a scenario exists,
+        # so they are built on the first generate (see _build_play_panels)
+        self._main_frame = frame
+        self._panels_built = False
+        self._game_buttons = []
+
+        # internal game state for stepping nights
+        self.scenario = None
+        self.current_night = 0
+        self.alive_set = set()
+        # alive players in scenario order; see alive_ordered()
+        self._alive_ordered_cache = None
+        # lookups derived from the scenario; rebuilt by _index_scenario()
+        self._players_cached = []
+        self._role_of = {}
+        self._role_map = {}
+        self._kill_priority = {}
+        self._player_row_index = {}
+        # text last shown in the cop reveal label
+        self._last_reveal_text = ''
+
+        # track votes in-memory for the current day index
+        self._current_day_votes = []
+        # (path, scenario hash) of the last .in written, to skip identical rewrites;
+        # both the Tk thread and the writer thread write, so it is used under the lock
+        self._last_written = None
+        self._last_written_lock = threading.Lock()
+        # default step-file names: one timestamp per session plus a counter
+        self._session_stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self._tally_step = 0
+        # step writes go through a single background writer (see _queue_write)
+        self._write_queue = queue.Queue()
+        self._write_errors = queue.Queue()
+        # set while _report_write_errors is scheduled
+        self._write_polling = False
+        threading.Thread(target=self._write_worker, daemon=True).start()
+        self.protocol('WM_DELETE_WINDOW', self._on_close)
+        # set while on_suggest's worker thread is running
+        self._suggest_running = False
+        # non-modal suggestions window, created on first use
+        self._suggest_win = None
+        self._suggest_txt = None
+        # voters of the current day, see _day_voters()
+        self._voters_today = set()
+        self._voters_day = None
+
+        # initialize auto assignment
+        self.on_players_change()
+
+    def _build_play_panels(self):
+        """Create the Night, Players and Day panels (once)."""
+        if self._panels_built:
+            return
+        self._panels_built = True
         # Night control UI
-        night_frame = ttk.LabelFrame(frame, text='Night controls', padding=8)
+        night_frame = ttk.LabelFrame(self._main_frame, text='Night controls', padding=8)
         night_frame.grid(row=15, column=0, columnspan=3, sticky='ew', pady=(8,0))
 
         ttk.Label(night_frame, text='Mafia target:').grid(row=0, column=0, sticky='w')
@@ -212,7 +365,7 @@ class GeneratorGUI(tk.Tk):
         self.next_btn.grid(row=3, column=0, pady=(6,0))
 
         # Player status list
-        status_frame = ttk.LabelFrame(frame, text='Players', padding=6)
+        status_frame = ttk.LabelFrame(self._main_frame, text='Players', padding=6)
         status_frame.grid(row=16, column=0, columnspan=3, sticky='ew', pady=(8,0))
         self.player_list = tk.Listbox(status_frame, height=8, width=30)
         self.player_list.grid(row=0, column=0, sticky='w')
@@ -237,14 +390,16 @@ class GeneratorGUI(tk.Tk):
         # Move Suggest button next to the suggest-player combobox for convenience
         self.suggest_btn = ttk.Button(status_frame, text='Suggest moves', command=self.on_suggest)
         self.suggest_btn.grid(row=1, column=2, padx=(6,0))
-
-        # internal game state for stepping nights
-        self.scenario = None
-        self.current_night = 0
-        self.alive_set = set()
+        # controls that are switched off together when the game ends
+        self._game_buttons = [self.next_btn, self.suggest_btn,
+                              self.mafia_target_cb, self.doc_target_cb, self.cop_target_cb]
+        # Mace4 verification of each suggestion is opt-in: it costs one solver run per candidate
+        self.verify_var = tk.BooleanVar(value=False)
+        self.verify_cb = ttk.Checkbutton(status_frame, text='Verify with Mace4', variable=self.verify_var)
+        self.verify_cb.grid(row=2, column=1, columnspan=2, sticky='w')
 
         # Day voting UI
-        day_frame = ttk.LabelFrame(frame, text='Day / Voting', padding=6)
+        day_frame = ttk.LabelFrame(self._main_frame, text='Day / Voting', padding=6)
         day_frame.grid(row=17, column=0, columnspan=3, sticky='ew', pady=(8,0))
         ttk.Label(day_frame, text='Voter:').grid(row=0, column=0, sticky='w')
         self.voter_var = tk.StringVar(value='')
@@ -264,15 +419,10 @@ class GeneratorGUI(tk.Tk):
         self.tally_btn = ttk.Button(day_frame, text='Tally votes', command=self.on_tally_votes)
         self.tally_btn.grid(row=1, column=4, padx=(6,0))
 
-        # track votes in-memory for the current day index
-        self._current_day_votes = []
         # cop reveal label
         self.cop_reveal_lbl = ttk.Label(day_frame, text='')
         self.cop_reveal_lbl.grid(row=2, column=0, columnspan=5, sticky='w', pady=(6,0))
 
-        # initialize auto assignment
-        self.on_players_change()
-
     def on_players_change(self):
         n = self.players_var.get()
         # auto-assign is always active: compute defaults from player count
@@ -307,7 +457,7 @@ class GeneratorGUI(tk.Tk):
             return
 
         # assign player names a,b,c,...
-        players = list(string.ascii_lowercase[:n])
+        players = list(ALPHABET[:n])
         roles = {}
         assigned = set()
 
@@ -341,19 +491,18 @@ class GeneratorGUI(tk.Tk):
         # create output path
         safe_time = datetime.now().strftime('%Y%m%d_%H%M%S')
         out_name = f'gui_generated_{safe_time}.in'
-        out_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'prover9', out_name))
-        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        out_path = str(PROVER9_DIR / out_name)
 
         try:
-            write_in(out_path, scenario)
+            self._write_scenario(out_path, scenario)
         except Exception as e:
             messagebox.showerror('Generation error', f'Failed to write file:\n{e}')
             return
 
-        # open file in default editor (macOS open)
+        # open file in default editor
         try:
-            os.system(f'open "{out_path}"')
-        except Exception:
+            open_in_editor(out_path)
+        except OSError:
             pass
         # set the generated file path in the Model check field so user can immediately check it
         self.file_var.set(out_path)
@@ -362,8 +511,15 @@ class GeneratorGUI(tk.Tk):
         self.status.config(text=f'Wrote {out_path}')
         # initialize internal scenario state for stepping
         self.scenario = scenario
+        self._voters_day = None
+        self._index_scenario()
+        self._build_play_panels()
+        # suggestion workers may be reading the cache; clear it under their lock
+        with _mace_cache_lock:
+            _mace_cache.clear()
         self.current_night = 0
         self.alive_set = set(players)
+        self._invalidate_alive_cache()
         # populate target comboboxes
         vals = players.copy()
         self.mafia_target_cb['values'] = vals
@@ -372,7 +528,7 @@ class GeneratorGUI(tk.Tk):
         # populate suggest-player combobox
         self.suggest_player_cb['values'] = vals
         # populate time combobox n0..nN
-        times = [f'n{i}' for i in range(0, nights + 1)]
+        times = TIMES_CACHE.get(nights) or [f'n{i}' for i in range(0, nights + 1)]
         self.time_cb['values'] = times
         # default to n1 if available
         if 'n1' in times:
@@ -380,72 +536,76 @@ class GeneratorGUI(tk.Tk):
         else:
             self.time_var.set(times[0] if times else '')
         # refresh player list display
-        self.refresh_player_list()
+        self.refresh_player_list(flush=False)
         # ensure night controls are enabled for a new scenario
-        try:
-            self.next_btn.state(['!disabled'])
-            self.suggest_btn.state(['!disabled'])
-            self.mafia_target_cb.state(['!enabled'])
-            self.doc_target_cb.state(['!enabled'])
-            self.cop_target_cb.state(['!enabled'])
-        except Exception:
-            pass
+        self._set_game_enabled(True)
+        self.update_idletasks()
 
     def browse_file(self):
-        p = filedialog.askopenfilename(initialdir=os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'prover9')), filetypes=[('Prover9 files', '*.in'), ('All files', '*')])
+        p = filedialog.askopenfilename(initialdir=str(PROVER9_DIR), filetypes=[('Prover9 files', '*.in'), ('All files', '*')])
         if p:
             self.file_var.set(p)
 
-    def refresh_player_list(self):
+    @staticmethod
+    def _set_combo_values(cb, vals):
+        # skip the reconfigure (and redraw) when the values are unchanged
+        if tuple(cb['values']) != tuple(vals):
+            cb['values'] = vals
+
+    def refresh_player_list(self, flush=True):
         self.player_list.delete(0, 'end')
         if not self.scenario:
             # show players placeholder from current spinner
             try:
                 n = self.players_var.get()
-                players = list(string.ascii_lowercase[:n])
+                players = list(ALPHABET[:n])
             except Exception:
                 players = []
-            for p in players:
-                self.player_list.insert('end', f'{p}: unknown')
+            self.player_list.insert('end', *[f'{p}: unknown' for p in players])
+            self._player_row_index = {p: i for i, p in enumerate(players)}
             # also update suggest player combobox values to match placeholder
             try:
                 self.suggest_player_cb['values'] = players
             except Exception:
                 pass
             return
-        for p in self.scenario.get('players', []):
-            status = 'alive' if p in self.alive_set else 'dead'
-            role = self.scenario.get('roles', {}).get(p, '?')
-            self.player_list.insert('end', f'{p}: {status} ({role})')
+        players = self.scenario.get('players', [])
+        roles = self.scenario.get('roles', {})
+        # insert all rows in one Tcl call, then style only the eliminated ones
+        rows = [f'{p}: {"alive" if p in self.alive_set else "dead"} ({roles.get(p, "?")})' for p in players]
+        self.player_list.insert('end', *rows)
+        # row of each player, so animate_elimination needn't scan the Listbox
+        self._player_row_index = {p: i for i, p in enumerate(players)}
+        for idx, p in enumerate(players):
+            if p in self.alive_set:
+                continue
             # style eliminated players with strike-through / gray
             try:
-                idx = self.player_list.size() - 1
-                if status == 'dead':
-                    if self._player_strike is not None:
-                        self.player_list.itemconfig(idx, foreground='gray40', font=self._player_strike)
-                    else:
-                        self.player_list.itemconfig(idx, foreground='gray40')
+                if self._player_strike is not None:
+                    self.player_list.itemconfig(idx, foreground='gray40', font=self._player_strike)
                 else:
-                    if self._player_font is not None:
-                        self.player_list.itemconfig(idx, font=self._player_font, foreground='black')
+                    self.player_list.itemconfig(idx, foreground='gray40')
             except Exception:
                 pass
         # update suggest-player combobox to current players (alive first)
         try:
-            vals = [p for p in self.scenario.get('players', []) if p in self.alive_set]
+            vals = list(self.alive_ordered())
             if not vals:
-                vals = self.scenario.get('players', [])
-            self.suggest_player_cb['values'] = vals
+                vals = players
+            self._set_combo_values(self.suggest_player_cb, vals)
             # also refresh voter/target comboboxes
             try:
-                self.voter_cb['values'] = vals
-                self.vote_target_cb['values'] = vals
+                self._set_combo_values(self.voter_cb, vals)
+                self._set_combo_values(self.vote_target_cb, vals)
                 # refresh votes list display
                 self.refresh_vote_controls()
             except Exception:
                 pass
         except Exception:
             pass
+        # draw once; callers doing more updates pass flush=False and flush themselves
+        if flush:
+            self.update_idletasks()
 
     def show_check_help(self):
         """Show a short, user-friendly explanation of what "Check alive" does.
@@ -480,12 +640,11 @@ class GeneratorGUI(tk.Tk):
         """
         if not self.scenario:
             return None
-        alive = set(self.alive_set)
+        alive = self.alive_set
         if not alive:
             return None
-        roles = self.scenario.get('roles', {})
-        mafia_alive = sum(1 for p in alive if roles.get(p) == 'mafia')
-        others_alive = sum(1 for p in alive if roles.get(p) != 'mafia')
+        mafia_alive = sum(1 for p in self._role_map.get('mafia', ()) if p in alive)
+        others_alive = len(alive) - mafia_alive
 
         if mafia_alive == 0:
             return 'villagers'
@@ -513,9 +672,8 @@ class GeneratorGUI(tk.Tk):
         self.scenario.setdefault('night_actions', {})[str(n)] = []
         # generator expects 'by' to be a player constant; our GUI uses roles, try map
         # map role names to actual players if unique, else use first player with that role
-        role_map = {}
-        for p, r in self.scenario.get('roles', {}).items():
-            role_map.setdefault(r, []).append(p)
+        self._index_scenario()
+        role_map = self._role_map
         recorded = []
         for a in acts:
             typ = a['type']
@@ -532,10 +690,13 @@ class GeneratorGUI(tk.Tk):
                 return
             recorded.append({'type': typ, 'by': by_actor, 'target': target})
         self.scenario['night_actions'][str(n)] = recorded
+        with _mace_cache_lock:
+            _mace_cache.clear()
 
         # simulate outcome locally: if mafia targeted someone and doctor did not protect same person -> death
         if m_target and (m_target != d_target) and (m_target in self.alive_set):
             self.alive_set.discard(m_target)
+            self._invalidate_alive_cache()
 
         # advance night
         self.current_night += 1
@@ -543,21 +704,21 @@ class GeneratorGUI(tk.Tk):
         # write updated .in file with current scenario
         try:
             # write to same out path as file_var if set, else to prover9/gui_generated_next.in
-            outp = self.file_var.get().strip() or os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'prover9', f'gui_generated_step_{datetime.now().strftime("%Y%m%d_%H%M%S")}.in'))
-            write_in(outp, self.scenario)
+            outp = self.file_var.get().strip() or self._next_step_path()
+            self._queue_write(outp)
             self.file_var.set(outp)
         except Exception as e:
             messagebox.showerror('Write error', f'Failed to write updated .in: {e}')
 
         # update combobox options to current alive players
-        vals = [p for p in self.scenario.get('players', []) if p in self.alive_set]
+        vals = list(self.alive_ordered())
         if not vals:
             vals = self.scenario.get('players', [])
         self.mafia_target_cb['values'] = vals
         self.doc_target_cb['values'] = vals
         self.cop_target_cb['values'] = vals
 
-        self.refresh_player_list()
+        self.refresh_player_list(flush=False)
 
         # reset current day votes for the new day
         self._current_day_votes = []
@@ -565,6 +726,7 @@ class GeneratorGUI(tk.Tk):
             self.refresh_vote_controls()
         except Exception:
             pass
+        self.update_idletasks()
 
         # check for win condition
         winner = self.check_win()
@@ -576,15 +738,115 @@ class GeneratorGUI(tk.Tk):
             messagebox.showinfo('Game Over', message)
             self.status.config(text=message)
             # disable night controls to prevent further play
+            self._set_game_enabled(False)
+
+    def _next_step_path(self):
+        """Path for the next step file when no .in file is selected."""
+        path = str(PROVER9_DIR / f'gui_generated_step_{self._session_stamp}_{self._tally_step:04d}.in')
+        self._tally_step += 1
+        return path
+
+    def _scenario_snapshot(self):
+        """Return a copy of the scenario that a worker thread can read safely.
+
+        The containers the GUI keeps mutating (players, roles, each night's
+        actions and each day's votes) are copied, so the copy never sees a
+        half-updated game.
+        """
+        scen = self.scenario
+        return {
+            **scen,
+            'players': list(scen.get('players', [])),
+            'roles': dict(scen.get('roles', {})),
+            'night_actions': {k: list(v) for k, v in scen.get('night_actions', {}).items()},
+            'day_votes': {k: list(v) for k, v in scen.get('day_votes', {}).items()},
+        }
+
+    def _queue_write(self, path):
+        """Write the current scenario to `path` on the writer thread."""
+        self._write_queue.put((path, self._scenario_snapshot()))
+        if not self._write_polling:
+            self._write_polling = True
+            self.after(200, self._report_write_errors)
+
+    def _write_worker(self):
+        while True:
+            item = self._write_queue.get()
+            try:
+                if item is None:
+                    return
+                self._write_scenario(*item)
+            except Exception as e:
+                self._write_errors.put(e)
+            finally:
+                self._write_queue.task_done()
+
+    def _report_write_errors(self):
+        # poll until the writer is idle; read the count first, since the
+        # worker queues an error before it marks its task done
+        busy = self._write_queue.unfinished_tasks
+        while True:
+            try:
+                e = self._write_errors.get_nowait()
+            except queue.Empty:
+                break
+            messagebox.showerror('Write error', f'Failed to write updated .in: {e}')
+        if busy:
+            self.after(200, self._report_write_errors)
+        else:
+            self._write_polling = False
+
+    def _flush_writes(self):
+        """Block until every queued step write has hit the disk."""
+        self._write_queue.join()
+
+    def _on_close(self):
+        self._flush_writes()
+        self.destroy()
+
+    def _set_game_enabled(self, enabled):
+        """Enable or disable the night/suggest controls in one go."""
+        state = ['!disabled'] if enabled else ['disabled']
+        for w in self._game_buttons:
             try:
-                self.next_btn.state(['disabled'])
-                self.suggest_btn.state(['disabled'])
-                self.mafia_target_cb.state(['disabled'])
-                self.doc_target_cb.state(['disabled'])
-                self.cop_target_cb.state(['disabled'])
+                w.state(state)
             except Exception:
                 pass
 
+    def _write_scenario(self, path, scenario):
+        """write_in() `scenario` to `path` unless that exact scenario was the last one written there."""
+        # empty per-night/per-day entries produce no clauses, so leave them out of the key
+        norm = dict(scenario)
+        for k in ('night_actions', 'day_votes'):
+            norm[k] = {n: v for n, v in scenario.get(k, {}).items() if v}
+        key = (path, hash(json.dumps(norm, sort_keys=True)))
+        with self._last_written_lock:
+            if key == self._last_written and os.path.exists(path):
+                return
+            write_in(path, scenario)
+            self._last_written = key
+
+    def alive_ordered(self):
+        """Alive players as a tuple in scenario order (cached until alive_set changes)."""
+        if self._alive_ordered_cache is None:
+            players = self.scenario.get('players', []) if self.scenario else []
+            self._alive_ordered_cache = tuple(p for p in players if p in self.alive_set)
+        return self._alive_ordered_cache
+
+    def _invalidate_alive_cache(self):
+        self._alive_ordered_cache = None
+
+    def _index_scenario(self):
+        """Rebuild the player list and role lookups for the current scenario."""
+        roles = self.scenario.get('roles', {}) if self.scenario else {}
+        self._players_cached = list(self.scenario.get('players', [])) if self.scenario else []
+        self._role_of = dict(roles)
+        self._role_map = {}
+        for p, r in roles.items():
+            self._role_map.setdefault(r, []).append(p)
+        # mafia kill-order rank per player: cop, then doctor, then everyone else
+        self._kill_priority = {p: KILL_PRIORITY.get(roles.get(p, 'villager'), 2) for p in self._players_cached}
+
     def on_suggest(self):
         # Suggest role-aware moves for the selected player (use suggest combo first, then list)
         sel = self.suggest_player_var.get().strip() if hasattr(self, 'suggest_player_var') else ''
@@ -603,141 +865,232 @@ class GeneratorGUI(tk.Tk):
             messagebox.showinfo('Suggest', 'Generate or load a scenario first.')
             return
 
-        role = self.scenario.get('roles', {}).get(sel, 'villager')
+        if self._suggest_running:
+            self.status.config(text='Suggestions are still being computed...')
+            return
+        # snapshot everything the worker reads, so stepping the game meanwhile
+        # (Next night, Generate, Add vote) can't mix two game states
+        scenario = self._scenario_snapshot()
+        role_of = dict(self._role_of)
+        role_map = {r: list(ps) for r, ps in self._role_map.items()}
+        kill_priority = dict(self._kill_priority)
+        alive = frozenset(self.alive_set)
+        alive_order = self.alive_ordered()
+        night = self.current_night
+        verify = mq is not None and self.verify_var.get()
+        # filled by the worker, shown progressively by poll() below
         suggestions = []
-        next_time = f'n{self.current_night+1}'
-        maxd = None
 
-        # helper to run a simulated action and check a Mace4 query
-        def simulate_and_check(temp_scn, query):
-            tmp = None
-            try:
-                with tempfile.NamedTemporaryFile('w', suffix='.in', delete=False) as tf:
-                    tmp = tf.name
-                    try:
-                        write_in(tmp, temp_scn)
-                    except Exception:
-                        pass
-                rc, out, parsed = mq.run_query_return(Path(tmp), query) if mq is not None else (-2, '', {})
-            except Exception as e:
-                return -1, str(e), {}
-            finally:
-                # cleanup temp file
+        def build_suggestions(scenario, role_of, role_map, kill_priority):
+            role = role_of.get(sel, 'villager')
+            next_time = f'n{night+1}'
+            night_key = str(night)
+            # fixed tail of the alive(...)/-alive(...) queries built per candidate
+            time_suffix = ',' + next_time + ')'
+
+            # helper to run a simulated action and check a Mace4 query
+            def simulate_and_check(temp_scn, query):
+                if mq is None:
+                    return -2, '', {}
                 try:
-                    if tmp and os.path.exists(tmp):
-                        os.unlink(tmp)
-                except Exception:
-                    pass
-            return rc, out, parsed
-
-        # Role-specific heuristics
-        if role == 'doctor':
-            suggestions.append('You are a Doctor — protect someone tonight to save them.')
-            # try protecting each alive player (including self)
-            for tgt in [p for p in self.scenario.get('players', []) if p in self.alive_set]:
-                temp = json.loads(json.dumps(self.scenario))
-                temp.setdefault('night_actions', {})[str(self.current_night)] = []
-                temp['night_actions'][str(self.current_night)].append({'type': 'protect', 'by': sel, 'target': tgt})
-                if mq is not None:
-                    rc, out, parsed = simulate_and_check(temp, f'alive({tgt},{next_time})')
-                    if rc == 0 and parsed:
-                        suggestions.append(f'Verified: protecting {tgt} can produce a model where they survive.')
-                    else:
-                        suggestions.append(f'Check failed/unknown for protecting {tgt}.')
-
-        elif role == 'mafia':
-            suggestions.append('You are Mafia — choose a kill target to reduce town power.')
-            # prefer killing cops/doctors first
-            candidates = [p for p in self.scenario.get('players', []) if p in self.alive_set and p != sel]
-            # sort by priority: cop, doctor, villager
-            def priority(p):
-                r = self.scenario.get('roles', {}).get(p, 'villager')
-                return 0 if r == 'cop' else (1 if r == 'doctor' else 2)
-            candidates.sort(key=priority)
-            # compute alive cops before simulating; used to detect killing last cop
-            cops_alive = [p for p, r in self.scenario.get('roles', {}).items() if r == 'cop' and p in self.alive_set]
-            # compute alive cops before simulating; used to detect killing last cop
-            cops_alive = [p for p, r in self.scenario.get('roles', {}).items() if r == 'cop' and p in self.alive_set]
-            doctors_alive = [p for p, r in self.scenario.get('roles', {}).items() if r == 'doctor' and p in self.alive_set]
-            for tgt in candidates:
-                temp = json.loads(json.dumps(self.scenario))
-                temp.setdefault('night_actions', {})[str(self.current_night)] = []
-                temp['night_actions'][str(self.current_night)].append({'type': 'kill', 'by': sel, 'target': tgt})
-                # heuristic warnings
-                tgt_role = self.scenario.get('roles', {}).get(tgt, 'villager')
-                if tgt_role == 'cop':
-                    # if this is the last alive cop, killing them is a huge advantage for mafia
-                    if len(cops_alive) == 1 and tgt in cops_alive:
-                        suggestions.append(f'Killing {tgt} would eliminate the last Cop — this may allow the Mafia to win.')
-                    else:
-                        suggestions.append(f'Killing {tgt} (Cop) weakens the town.')
-                if tgt_role == 'doctor':
-                    # killing the last doctor removes protection ability — big advantage
-                    if len(doctors_alive) == 1 and tgt in doctors_alive:
-                        suggestions.append(f'Killing {tgt} would eliminate the last Doctor — no more protections possible, increasing Mafia chances.')
-                    else:
-                        suggestions.append(f'Killing {tgt} (Doctor) reduces town protection capability.')
-                if mq is not None:
-                    # check if there is a model where target is dead next_time
-                    rc, out, parsed = simulate_and_check(temp, f'-alive({tgt},{next_time})')
-                    if rc == 0 and parsed:
-                        suggestions.append(f'Verified kill possible: killing {tgt} can lead to them being dead at {next_time}.')
-                    else:
-                        suggestions.append(f'Could not verify kill-for-{tgt} (unknown/unsat).')
-
-        elif role == 'cop':
-            suggestions.append('You are a Cop — investigate someone to reveal their alignment.')
-            candidates = [p for p in self.scenario.get('players', []) if p in self.alive_set and p != sel]
-            for tgt in candidates:
-                suggestions.append(f'Investigate {tgt} (heuristic).')
-                # if target is mafia in the scenario, investigating them yields town win
-                tgt_role = self.scenario.get('roles', {}).get(tgt, 'villager')
-                if tgt_role == 'mafia':
-                    suggestions.append(f'If you investigate {tgt} you will find they are MAFIA — Villagers can win.')
-                if mq is not None:
-                    temp = json.loads(json.dumps(self.scenario))
-                    temp.setdefault('night_actions', {})[str(self.current_night)] = []
-                    temp['night_actions'][str(self.current_night)].append({'type': 'investigate', 'by': sel, 'target': tgt})
-                    rc, out, parsed = simulate_and_check(temp, f'investigate({sel},{tgt},n{self.current_night})')
-                    if rc == 0 and parsed:
-                        suggestions.append(f'Investigation action for {tgt} is consistent in a model (parser OK).')
+                    # fingerprint the scenario itself so cache hits skip building the .in text
+                    fp = hashlib.blake2b(json.dumps(temp_scn, sort_keys=True, separators=(',', ':')).encode(), digest_size=16).digest()
+                    key = (fp, query)
+                    with _mace_cache_lock:
+                        hit = _mace_cache.get(key)
+                        if hit is not None:
+                            _mace_cache.move_to_end(key)
+                            return hit
+                    # the .in text goes straight to Mace4; no scratch file on disk
+                    rc, out, parsed = mq.run_query_return(mq.prepare_text(build_in_text(temp_scn)), query)
+                    with _mace_cache_lock:
+                        _mace_cache[key] = (rc, out, parsed)
+                        if len(_mace_cache) > _MACE_CACHE_MAX:
+                            _mace_cache.popitem(last=False)
+                except Exception as e:
+                    return -1, str(e), {}
+                return rc, out, parsed
+
+            # each check is its own Mace4 process, so run a role's candidates
+            # side by side and yield (target, result) as each one finishes;
+            # `tasks` maps target -> (scenario, query)
+            def check_each(tasks):
+                if not tasks:
+                    return
+                with ThreadPoolExecutor(max_workers=min(len(tasks), os.cpu_count() or 1)) as ex:
+                    futures = {ex.submit(simulate_and_check, *args): tgt for tgt, args in tasks.items()}
+                    for fut in as_completed(futures):
+                        yield futures[fut], fut.result()
+
+            # Role-specific heuristics
+            if role == 'doctor':
+                suggestions.append('You are a Doctor — protect someone tonight to save them.')
+                # try protecting each alive player (including self)
+                if verify:
+                    act_tmpl = {'type': 'protect', 'by': sel}
+                    tasks = {}
+                    for tgt in alive_order:
+                        temp = with_night_action(scenario, night_key, dict(act_tmpl, target=tgt))
+                        tasks[tgt] = (temp, 'alive(' + tgt + time_suffix)
+                    for tgt, (rc, out, parsed) in check_each(tasks):
+                        if rc == 0 and parsed:
+                            suggestions.append(f'Verified: protecting {tgt} can produce a model where they survive.')
+                        else:
+                            suggestions.append(f'Check failed/unknown for protecting {tgt}.')
+
+            elif role == 'mafia':
+                suggestions.append('You are Mafia — choose a kill target to reduce town power.')
+                # prefer killing cops/doctors first
+                candidates = [p for p in alive_order if p != sel]
+                # sort by priority: cop, doctor, villager
+                candidates.sort(key=kill_priority.__getitem__)
+                # compute alive cops/doctors before simulating; used to detect killing the last one
+                cops_alive = [p for p in role_map.get('cop', []) if p in alive]
+                doctors_alive = [p for p in role_map.get('doctor', []) if p in alive]
+                # the heuristic warnings are instant, so post them before any solver run
+                for tgt in candidates:
+                    tgt_role = role_of.get(tgt, 'villager')
+                    if tgt_role == 'cop':
+                        # if this is the last alive cop, killing them is a huge advantage for mafia
+                        if len(cops_alive) == 1 and tgt in cops_alive:
+                            suggestions.append(f'Killing {tgt} would eliminate the last Cop — this may allow the Mafia to win.')
+                        else:
+                            suggestions.append(f'Killing {tgt} (Cop) weakens the town.')
+                    if tgt_role == 'doctor':
+                        # killing the last doctor removes protection ability — big advantage
+                        if len(doctors_alive) == 1 and tgt in doctors_alive:
+                            suggestions.append(f'Killing {tgt} would eliminate the last Doctor — no more protections possible, increasing Mafia chances.')
+                        else:
+                            suggestions.append(f'Killing {tgt} (Doctor) reduces town protection capability.')
+                # with a single candidate there is nothing to choose between
+                if verify and len(candidates) > 1:
+                    # killing the last cop/doctor is already a decisive hint; don't spend a solver run on it
+                    decisive = set(cops_alive if len(cops_alive) == 1 else ()) | set(doctors_alive if len(doctors_alive) == 1 else ())
+                    act_tmpl = {'type': 'kill', 'by': sel}
+                    tasks = {}
+                    for tgt in candidates:
+                        if tgt in decisive:
+                            continue
+                        temp = with_night_action(scenario, night_key, dict(act_tmpl, target=tgt))
+                        # check if there is a model where target is dead next_time
+                        tasks[tgt] = (temp, '-alive(' + tgt + time_suffix)
+                    for tgt, (rc, out, parsed) in check_each(tasks):
+                        if rc == 0 and parsed:
+                            suggestions.append(f'Verified kill possible: killing {tgt} can lead to them being dead at {next_time}.')
+                        else:
+                            suggestions.append(f'Could not verify kill-for-{tgt} (unknown/unsat).')
+
+            elif role == 'cop':
+                suggestions.append('You are a Cop — investigate someone to reveal their alignment.')
+                candidates = [p for p in alive_order if p != sel]
+                for tgt in candidates:
+                    suggestions.append(f'Investigate {tgt} (heuristic).')
+                    # if target is mafia in the scenario, investigating them yields town win
+                    tgt_role = role_of.get(tgt, 'villager')
+                    if tgt_role == 'mafia':
+                        suggestions.append(f'If you investigate {tgt} you will find they are MAFIA — Villagers can win.')
+                if verify:
+                    act_tmpl = {'type': 'investigate', 'by': sel}
+                    query_prefix = 'investigate(' + sel + ','
+                    query_suffix = ',n' + night_key + ')'
+                    tasks = {}
+                    for tgt in candidates:
+                        temp = with_night_action(scenario, night_key, dict(act_tmpl, target=tgt))
+                        tasks[tgt] = (temp, query_prefix + tgt + query_suffix)
+                    for tgt, (rc, out, parsed) in check_each(tasks):
+                        if rc == 0 and parsed:
+                            suggestions.append(f'Investigation action for {tgt} is consistent in a model (parser OK).')
 
-        else:
-            # villager or unknown
-            suggestions.append('You are a Villager — try to get protected or follow Cop leads when available.')
-            # if there's a doctor, suggest asking doctor to protect you
-            doc_player = next((p for p, r in self.scenario.get('roles', {}).items() if r == 'doctor'), None)
-            if doc_player:
-                temp = json.loads(json.dumps(self.scenario))
-                temp.setdefault('night_actions', {})[str(self.current_night)] = []
-                temp['night_actions'][str(self.current_night)].append({'type': 'protect', 'by': doc_player, 'target': sel})
-                if mq is not None:
+            else:
+                # villager or unknown
+                suggestions.append('You are a Villager — try to get protected or follow Cop leads when available.')
+                # if there's a doctor, suggest asking doctor to protect you
+                doc_player = next(iter(role_map.get('doctor', ())), None)
+                if doc_player and verify:
+                    temp = with_night_action(scenario, night_key, {'type': 'protect', 'by': doc_player, 'target': sel})
                     rc, out, parsed = simulate_and_check(temp, f'alive({sel},{next_time})')
                     if rc == 0 and parsed:
                         suggestions.append(f'Verified: doctor protecting you can yield survival.')
                     else:
                         suggestions.append('Mace4 check: doctor-protect did NOT produce a model (unknown).')
 
-        # present suggestions
-        msg = '\n'.join(suggestions) if suggestions else 'No suggestions generated.'
-        messagebox.showinfo('Suggestions for ' + sel, msg)
+        # Mace4 checks can take seconds: compute on a worker thread and stream
+        # its lines into a non-modal window from the Tk main loop, which owns
+        # all widget calls
+        txt = self._suggestion_window(sel)
+        worker = threading.Thread(target=build_suggestions,
+                                  args=(scenario, role_of, role_map, kill_priority), daemon=True)
+        self._suggest_running = True
+        self.status.config(text=f'Computing suggestions for {sel}...')
+        worker.start()
+        shown = 0
+
+        def poll():
+            nonlocal shown
+            done = not worker.is_alive()
+            # the worker only appends, so everything up to len() is complete
+            n = len(suggestions)
+            if n > shown:
+                self._append_suggestions(txt, suggestions[shown:n])
+                shown = n
+            if not done:
+                self.after(50, poll)
+                return
+            self._suggest_running = False
+            self.status.config(text='')
+            if not suggestions:
+                self._append_suggestions(txt, ['No suggestions generated.'])
+
+        self.after(50, poll)
+
+    def _suggestion_window(self, sel):
+        """Return the (cleared) Text widget of the suggestions window, creating it if needed."""
+        win = self._suggest_win
+        try:
+            exists = win is not None and win.winfo_exists()
+        except tk.TclError:
+            exists = False
+        if not exists:
+            win = tk.Toplevel(self)
+            win.geometry('560x300')
+            self._suggest_txt = tk.Text(win, wrap='word')
+            self._suggest_txt.pack(fill='both', expand=True, padx=6, pady=6)
+            ttk.Button(win, text='Close', command=win.destroy).pack(pady=6)
+            self._suggest_win = win
+        win.title('Suggestions for ' + sel)
+        txt = self._suggest_txt
+        txt.config(state='normal')
+        txt.delete('1.0', 'end')
+        txt.config(state='disabled')
+        win.lift()
+        return txt
+
+    @staticmethod
+    def _append_suggestions(txt, lines):
+        try:
+            txt.config(state='normal')
+            txt.insert('end', ''.join(line + '\n' for line in lines))
+            txt.config(state='disabled')
+        except tk.TclError:
+            # window was closed while the suggestions were still coming in
+            pass
 
     def refresh_vote_controls(self):
         """Refresh vote comboboxes and votes list; show any cop reveals from previous night."""
         # populate comboboxes with alive players
+        scen = self.scenario
         vals = []
-        if self.scenario:
-            vals = [p for p in self.scenario.get('players', []) if p in self.alive_set]
+        if scen:
+            vals = list(self.alive_ordered())
             if not vals:
-                vals = list(self.scenario.get('players', []))
+                vals = list(scen.get('players', []))
         try:
-            # hide voters who have already voted this day (persisted or in-memory)
-            day_idx = max(0, self.current_night - 1)
-            persisted = [d.get('voter') for d in self.scenario.get('day_votes', {}).get(str(day_idx), [])] if self.scenario else []
-            voted_now = [v for v, _ in self._current_day_votes]
-            already = set(persisted + voted_now)
+            # hide voters who have already voted this day (every in-memory
+            # vote is persisted too, so the day's voter set covers both)
+            day_key = str(max(0, self.current_night - 1))
+            already = self._day_voters(day_key) if scen else ()
             available_voters = [p for p in vals if p not in already]
-            self.voter_cb['values'] = available_voters
+            self._set_combo_values(self.voter_cb, available_voters)
             # disable add button if no available voters
             if not available_voters:
                 try:
@@ -749,7 +1102,7 @@ class GeneratorGUI(tk.Tk):
                     self.add_vote_btn.state(['!disabled'])
                 except Exception:
                     pass
-            self.vote_target_cb['values'] = vals
+            self._set_combo_values(self.vote_target_cb, vals)
         except Exception:
             pass
 
@@ -760,17 +1113,21 @@ class GeneratorGUI(tk.Tk):
 
         # show cop reveals from last night (if any)
         reveal_msgs = []
-        if self.scenario and self.current_night > 0:
-            night_idx = str(self.current_night - 1)
-            acts = self.scenario.get('night_actions', {}).get(night_idx, [])
-            for a in acts:
+        if scen and self.current_night > 0:
+            night_actions = scen.get('night_actions')
+            acts = night_actions.get(str(self.current_night - 1)) if night_actions else None
+            role_of = self._role_of
+            for a in acts or ():
                 if a.get('type') == 'investigate':
                     by = a.get('by')
                     tgt = a.get('target')
                     # if the target is mafia, cop recognizes
-                    if self.scenario.get('roles', {}).get(tgt) == 'mafia':
+                    if role_of.get(tgt) == 'mafia':
                         reveal_msgs.append(f'Cop {by} discovered mafia: {tgt}')
-        self.cop_reveal_lbl.config(text='; '.join(reveal_msgs))
+        reveal_text = '; '.join(reveal_msgs)
+        if reveal_text != self._last_reveal_text:
+            self._last_reveal_text = reveal_text
+            self.cop_reveal_lbl.config(text=reveal_text)
 
     def show_check_help(self):
         """Show a short, user-friendly explanation of what "Check alive" does.
@@ -798,12 +1155,7 @@ class GeneratorGUI(tk.Tk):
     def animate_elimination(self, player: str):
         """Simple flash animation for an eliminated player in the Listbox."""
         try:
-            idx = None
-            for i in range(self.player_list.size()):
-                txt = self.player_list.get(i)
-                if txt.startswith(f'{player}:'):
-                    idx = i
-                    break
+            idx = self._player_row_index.get(player)
             if idx is None:
                 return
             default_bg = self.player_list.cget('background')
@@ -837,12 +1189,9 @@ class GeneratorGUI(tk.Tk):
             messagebox.showerror('Invalid vote', 'You cannot vote for yourself.')
             return
         # disallow voting twice in the same day (check in-memory and persisted day_votes)
-        day_idx = max(0, self.current_night - 1)
-        existing_voters = [v for v, _ in self._current_day_votes]
-        # include persisted votes for current day
-        persisted = [d.get('voter') for d in self.scenario.get('day_votes', {}).get(str(day_idx), [])]
-        existing_voters.extend(persisted)
-        if voter in existing_voters:
+        day_key = str(max(0, self.current_night - 1))
+        voters_today = self._day_voters(day_key)
+        if voter in voters_today:
             messagebox.showerror('Duplicate vote', f'{voter} has already voted this day.')
             return
         if voter not in self.alive_set:
@@ -857,33 +1206,40 @@ class GeneratorGUI(tk.Tk):
         self.votes_list.insert('end', f'{voter} -> {target}')
 
         # also append to scenario day_votes for persistence
-        day_idx = max(0, self.current_night - 1)
-        self.scenario.setdefault('day_votes', {}).setdefault(str(day_idx), []).append({'voter': voter, 'target': target})
+        self.scenario.setdefault('day_votes', {}).setdefault(day_key, []).append({'voter': voter, 'target': target})
+        voters_today.add(voter)
+
+    def _day_voters(self, day_key):
+        """Set of players who already voted on day `day_key`.
+
+        Built from the persisted day_votes the first time a day is asked for,
+        then kept up to date by on_add_vote (every in-memory vote is persisted too).
+        """
+        if self._voters_day != day_key:
+            self._voters_today = {d.get('voter') for d in self.scenario.get('day_votes', {}).get(day_key, [])}
+            self._voters_day = day_key
+        return self._voters_today
 
     def on_tally_votes(self):
         if not self.scenario:
             messagebox.showerror('No scenario', 'Generate or load a scenario first.')
             return
         # compute counts from current day's votes in scenario (use stored day_votes)
-        day_idx = max(0, self.current_night - 1)
-        votes = list(self.scenario.get('day_votes', {}).get(str(day_idx), []))
+        day_votes = self.scenario.get('day_votes')
+        votes = day_votes.get(str(max(0, self.current_night - 1))) if day_votes else None
         if not votes:
             messagebox.showinfo('Tally', 'No votes to tally for this day.')
             return
-        from collections import Counter
-        cnt = Counter([v['target'] for v in votes])
-        most = cnt.most_common()
-        top_count = most[0][1]
-        top = [p for p, c in most if c == top_count]
-        if len(top) == 1:
-            eliminated = top[0]
+        eliminated = vote_leader(votes)
+        if eliminated is not None:
             if eliminated in self.alive_set:
                 self.alive_set.discard(eliminated)
+                self._invalidate_alive_cache()
             messagebox.showinfo('Tally', f'{eliminated} was eliminated by vote.')
             # write updated .in to reflect elimination
             try:
-                outp = self.file_var.get().strip() or os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'prover9', f'gui_generated_step_{datetime.now().strftime("%Y%m%d_%H%M%S")}.in'))
-                write_in(outp, self.scenario)
+                outp = self.file_var.get().strip() or self._next_step_path()
+                self._queue_write(outp)
                 self.file_var.set(outp)
             except Exception as e:
                 messagebox.showerror('Write error', f'Failed to write updated .in: {e}')
@@ -908,14 +1264,7 @@ class GeneratorGUI(tk.Tk):
                 messagebox.showinfo('Game Over', msg)
                 self.status.config(text=msg)
                 # disable night controls to prevent further play
-                try:
-                    self.next_btn.state(['disabled'])
-                    self.suggest_btn.state(['disabled'])
-                    self.mafia_target_cb.state(['disabled'])
-                    self.doc_target_cb.state(['disabled'])
-                    self.cop_target_cb.state(['disabled'])
-                except Exception:
-                    pass
+                self._set_game_enabled(False)
         else:
             messagebox.showinfo('Tally', 'No unique top vote; no one eliminated.')
 
@@ -945,6 +1294,8 @@ class GeneratorGUI(tk.Tk):
         if not f:
             messagebox.showerror('No file', 'Select a .in file first (Browse).')
             return
+        # the selected file may still have a step write in flight
+        self._flush_writes()
 
         player = self.player_var.get().strip()
         time = self.time_var.get().strip()
@@ -958,14 +1309,35 @@ class GeneratorGUI(tk.Tk):
             pass
         self.check_status.config(text='Running Mace4...', foreground='black')
 
+        # run Mace4 on a worker thread so the window keeps repainting; the
+        # main loop polls for the result and handles it in _finish_check_alive
+        result = []
+        worker = threading.Thread(target=self._run_check_alive_worker, args=(Path(f), query, result), daemon=True)
+        worker.start()
+
+        def poll():
+            if worker.is_alive():
+                self.after(50, poll)
+            else:
+                self._finish_check_alive(*result[0])
+
+        self.after(50, poll)
+
+    @staticmethod
+    def _run_check_alive_worker(path, query, result):
         try:
-            try:
-                rc, out, parsed = mq.run_query_return(Path(f), query)
-            except Exception as e:
-                messagebox.showerror('Error', f'Failed to run Mace4 query:\n{e}')
+            rc, out, parsed = mq.run_query_return(path, query)
+        except Exception as e:
+            result.append((None, None, None, e))
+        else:
+            result.append((rc, out, parsed, None))
+
+    def _finish_check_alive(self, rc, out, parsed, error):
+        try:
+            if error is not None:
+                messagebox.showerror('Error', f'Failed to run Mace4 query:\n{error}')
                 self.check_status.config(text='Mace4 error', foreground='red')
                 return
-
             # Interpret parsed
             result = 'no model (unsat or error)'
             # if Mace4 returned non-zero, show its output to help debug
@@ -1021,18 +1393,14 @@ class GeneratorGUI(tk.Tk):
         # write JSON state to a temp file (for user inspection if desired)
         tmp_json = None
         try:
-            with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as jf:
+            # compact separators keep json on its C encoder; the file is for the checker, not for reading
+            with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False, buffering=1 << 16) as jf:
                 tmp_json = jf.name
-                json.dump(state, jf, indent=2)
+                json.dump(state, jf, separators=(',', ':'))
         except Exception:
             tmp_json = None
 
         # attempt to use the check_win helper if available
-        try:
-            import scripts.check_win_prover9 as cw
-        except Exception:
-            cw = None
-
         if cw is not None and hasattr(cw, 'check_state'):
             try:
                 res = cw.check_state(state)
@@ -1042,35 +1410,21 @@ class GeneratorGUI(tk.Tk):
             # map results
             vill = res.get('villagers')
             mafi = res.get('mafia')
-            msgs = []
-            for q, (rc, sat) in res.get('results', {}).items():
-                msgs.append(f"{q}: {'sat' if sat else 'unsat/unknown'} (rc={rc})")
-            summary = '\n'.join(msgs)
+            summary = '\n'.join(_fmt_win_result(q=q, v='sat' if sat else 'unsat/unknown', rc=rc)
+                                for q, (rc, sat) in res.get('results', {}).items())
+            if not summary:
+                summary = 'Decided directly from the alive counts (Mace4 was not run).'
+            # the verdict says whether Mace4 found a model or the alive counts decided it
             # show JSON path and results
             info_msg = f"State JSON: {tmp_json if tmp_json else '(not saved)'}\n\n{summary}"
             messagebox.showinfo('Prover9 win check', info_msg)
 
             # Update UI similar to local check
-            if vill and not mafi:
-                msg = 'Villagers win (Prover9 model found)'
-            elif mafi and not vill:
-                msg = 'Mafia win (Prover9 model found)'
-            elif mafi and vill:
-                msg = 'Both win predicates satisfiable (ambiguous)'
-            else:
-                msg = 'No winner yet (Prover9 did not find win predicate)'
-            self.status.config(text=msg)
+            self.status.config(text=cw.win_message(res))
             # disable controls only when exactly one win predicate is true
             # (i.e., villagers XOR mafia). If both are true it's ambiguous; keep controls enabled.
             if bool(vill) ^ bool(mafi):
-                try:
-                    self.next_btn.state(['disabled'])
-                    self.suggest_btn.state(['disabled'])
-                    self.mafia_target_cb.state(['disabled'])
-                    self.doc_target_cb.state(['disabled'])
-                    self.cop_target_cb.state(['disabled'])
-                except Exception:
-                    pass
+                self._set_game_enabled(False)
             return
         else:
             # Fallback: use local GUI-only check
@@ -1096,30 +1450,36 @@ class GeneratorGUI(tk.Tk):
         txt = tk.Text(win, wrap='none')
         txt.pack(fill='both', expand=True, padx=6, pady=6)
         by_index = summary.get('by_index', {})
-        txt.insert('end', 'Domain elements (index -> names):\n')
+        # build the whole text first and insert it with one Tcl call
+        buf = ['Domain elements (index -> names):\n']
         for idx in sorted(by_index.keys()):
             names = by_index[idx]
-            txt.insert('end', f'  {idx}: {", ".join(names)}\n')
-
-        txt.insert('end', '\nRelations:\n')
-        for rname, info in summary.get('relations', {}).items():
+            buf.append(f'  {idx}: {", ".join(names)}\n')
+
+        buf.append('\nRelations:\n')
+        relations = summary.get('relations', {})
+        # display name of every domain element, joined once for all relations
+        max_ds = max((info.get('domain_size', 0) for info in relations.values()), default=0)
+        name_for = {i: '/'.join(by_index.get(i, [str(i)])) for i in range(max_ds)}
+        # right-hand sides list every name of an element, comma separated
+        names_for = {i: ', '.join(by_index.get(i, [str(i)])) for i in range(max_ds)}
+        for rname, info in relations.items():
             ar = info.get('arity')
-            txt.insert('end', f'  {rname} (arity {ar}):\n')
+            buf.append(f'  {rname} (arity {ar}):\n')
             if ar == 2:
                 ds = info.get('domain_size', 0)
                 mapping = info.get('mapping', {})
                 for i in range(ds):
-                    left_names = by_index.get(i, [str(i)])
                     rights = mapping.get(i, [])
                     if rights:
-                        right_names = []
-                        for j in rights:
-                            right_names.extend(by_index.get(j, [str(j)]))
-                        txt.insert('end', f'    {"/".join(left_names)} -> {", ".join(right_names)}\n')
+                        right = ', '.join(names_for[j] if j in names_for else str(j) for j in rights)
+                        buf.append(f'    {name_for[i]} -> {right}\n')
                     else:
-                        txt.insert('end', f'    {"/".join(left_names)} -> (none)\n')
+                        buf.append(f'    {name_for[i]} -> (none)\n')
             else:
-                txt.insert('end', f'    values: {info.get("values")}\n')
+                buf.append(f'    values: {info.get("values")}\n')
+        txt.insert('end', ''.join(buf))
+        txt.config(state='disabled')
 
         btn = ttk.Button(win, text='Close', command=win.destroy)
         btn.pack(pady=6)
@@ -12,73 +12,224 @@ If Mace4 is not installed or on PATH the script will print an informative error.
 """
 
 import argparse
+import asyncio
+import functools
+import math
+import os
+import re
 import shutil
 import subprocess
 import sys
 import tempfile
+import threading
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+# Matched against one interpretation entry at a time (see parse_mace_model_output).
+# The last entry shares its line with the interpretation's closing '])', as
+# in 'relation(p(_), [ 1, 0 ])]).', hence the tail that allows ']).' and ','.
+# Mace4 output is ASCII and is parsed as bytes, without decoding it first.
+_FUNC_RE = re.compile(rb"^\s*function\(\s*([^,\s]+)\s*,\s*\[([^\]]*)\]\)[\]).,\s]*$")
+# groups: full name such as alive(_,_), its argument list, values
+_REL_RE = re.compile(rb"^\s*relation\(\s*([^,\(\s]+\(([^\)]*)\))\s*,\s*\[([^\]]*)\]\)[\]).,\s]*$")
+_PRED_RE = re.compile(r"\b[a-z][a-z0-9_]*\s*\(([^)]*)\)")
+_CONST_RE = re.compile(r"^[a-z][a-z0-9_]*$")
 
-def insert_query_into_assumptions(text: str, query: str) -> str:
+
+def _assumptions_end(text: str) -> int:
+    """Return the offset in `text` where a query is inserted into the assumptions."""
     marker = 'formulas(assumptions).'
     idx = text.find(marker)
     if idx == -1:
         raise ValueError('Could not find "formulas(assumptions)." in the input file')
     # find the end of the assumptions block (first occurrence of a line that is exactly 'end.' after idx)
-    rest = text[idx:]
-    end_marker = '\nend.\n'
-    end_idx = rest.find(end_marker)
+    end_idx = text.find('\nend.\n', idx)
     if end_idx == -1:
         # try without surrounding newlines
-        end_marker = 'end.'
-        end_idx = rest.find(end_marker)
+        end_idx = text.find('end.', idx)
         if end_idx == -1:
             raise ValueError('Could not find end of assumptions ("end.")')
-    insert_pos = idx + end_idx
-    # build new text: before insert_pos + query + then rest from insert_pos
-    before = text[:insert_pos]
-    after = text[insert_pos:]
+    return end_idx
+
+
+def _query_line(query: str) -> str:
     qline = query.strip()
     if not qline.endswith('.'):
         qline = qline + '.'
-    new_text = before + qline + '\n' + after
-    return new_text
+    return qline + '\n'
 
 
-def run_mace4(onfile: Path, mace4_cmd: str = 'mace4') -> int:
-    cmd = [mace4_cmd, '-f', str(onfile)]
-    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
-    return proc.returncode, proc.stdout
+def insert_query_into_assumptions(text: str, query: str) -> str:
+    insert_pos = _assumptions_end(text)
+    return text[:insert_pos] + _query_line(query) + text[insert_pos:]
 
 
-def parse_mace_model_output(output: str) -> dict:
-    """Parse a Mace4 model output and return a dict with functions and relations.
+# Whether each Mace4 command reads its input from stdin when run without -f;
+# filled in by _accepts_stdin() with one probe run per command.
+_MACE4_ACCEPTS_STDIN = {}
+_PROBE_INPUT = 'formulas(assumptions).\np.\nend.\n'
 
-    Returns a structure: { 'functions': {name: [ints...]}, 'relations': {name: {'arity':k, 'values':[0/1...]}} }
-    If no model found or parsing fails, returns empty dict.
-    """
-    import re
 
-    data = {'functions': {}, 'relations': {}}
-    # find the interpretation block
-    m = re.search(r"interpretation\s*\(.*?\,\s*\[.*?\],\s*\[\s*(.*?)\]\)\.", output, re.S)
-    # The above attempt can be brittle; instead parse lines for 'function(' and 'relation('
-    func_re = re.compile(r"function\(([^,]+)\s*,\s*\[([^\]]*)\]\)")
-    rel_re = re.compile(r"relation\(([^,\(]+\([^\)]*\))\s*,\s*\[([^\]]*)\]\)" )
+def _accepts_stdin(mace4_cmd: str) -> bool:
+    ok = _MACE4_ACCEPTS_STDIN.get(mace4_cmd)
+    if ok is None:
+        try:
+            proc = subprocess.run([mace4_cmd], input=_PROBE_INPUT, stdout=subprocess.PIPE,
+                                  stderr=subprocess.STDOUT, text=True, timeout=30)
+            ok = proc.returncode == 0
+        except (OSError, subprocess.SubprocessError):
+            ok = False
+        _MACE4_ACCEPTS_STDIN[mace4_cmd] = ok
+    return ok
 
-    for fm in func_re.finditer(output):
-        name = fm.group(1).strip()
-        vals = [int(x) for x in fm.group(2).split(',') if x.strip()]
-        data['functions'][name] = vals
 
-    for rm in rel_re.finditer(output):
-        name = rm.group(1).strip()  # e.g. alive(_,_)
-        vals = [int(x) for x in rm.group(2).split(',') if x.strip()]
-        # determine arity by counting underscores or commas inside parentheses
-        arity = name.count('_')
-        data['relations'][name] = {'arity': arity, 'values': vals}
+def _write_stdin(stream, data: bytes):
+    try:
+        stream.write(data)
+        stream.close()
+    except OSError:
+        # Mace4 exited without reading all of its input; the exit code tells why
+        pass
 
-    return data
+
+def run_mace4(onfile=None, mace4_cmd: str = 'mace4', on_line=None, *, input_data: bytes = None):
+    """Run Mace4 and return (returncode, output).
+
+    `onfile` is the path (str or path-like) of a `.in` file. To run on
+    in-memory input instead, leave it out and pass the bytes as
+    `input_data`; they are piped to Mace4's stdin, or written to a temporary
+    file (removed when the run ends) if the Mace4 build does not read stdin.
+
+    If `on_line` is given it is called with each output line, as bytes, as
+    Mace4 writes it, so a ModelParser can work while the search is still
+    running. The output is decoded to str only once, for the return value.
+    """
+    if (onfile is None) == (input_data is None):
+        raise ValueError('run_mace4 needs exactly one of onfile or input_data')
+    if input_data is not None and not _accepts_stdin(mace4_cmd):
+        with tempfile.NamedTemporaryFile(suffix='.in', delete=False) as tmp:
+            tmp.write(input_data)
+        try:
+            return run_mace4(tmp.name, mace4_cmd, on_line)
+        finally:
+            os.unlink(tmp.name)
+    if input_data is None:
+        data = None
+        cmd, stdin = [mace4_cmd, '-f', os.fspath(onfile)], None
+    else:
+        data = bytes(input_data)
+        cmd, stdin = [mace4_cmd], subprocess.PIPE
+    lines = []
+    with subprocess.Popen(cmd, stdin=stdin, stdout=subprocess.PIPE, stderr=subprocess.STDOUT) as proc:
+        writer = None
+        if data is not None:
+            # feed stdin from another thread so a chatty Mace4 can't block on a full stdout pipe
+            writer = threading.Thread(target=_write_stdin, args=(proc.stdin, data), daemon=True)
+            writer.start()
+        for line in proc.stdout:
+            lines.append(line)
+            if on_line is not None:
+                on_line(line)
+        rc = proc.wait()
+        if writer is not None:
+            writer.join()
+    return rc, b''.join(lines).decode(errors='replace')
+
+
+def _parse_ints(s: bytes) -> list:
+    # int() takes bytes and skips the spaces and newlines around each value by itself
+    return list(map(int, s.split(b','))) if s.strip() else []
+
+
+class ModelParser:
+    """Incremental parser for Mace4 model output; feed() it one line (bytes) at a time.
+
+    `data` has the structure returned by parse_mace_model_output(); `found`
+    tells whether the output contained a model at all.
+    """
+
+    def __init__(self):
+        self.data = {'functions': {}, 'relations': {}}
+        self.found = False
+        self._entry = None
+
+    @property
+    def model(self):
+        """The parsed model, or None if no interpretation was seen."""
+        return self.data if self.found else None
+
+    def feed(self, line: bytes):
+        # an entry's value list may continue over several lines (e.g. binary
+        # relations), so collect it up to the closing '])'
+        entry = self._entry
+        if entry is None:
+            stripped = line.lstrip()
+            if not stripped.startswith((b'function(', b'relation(')):
+                if stripped.startswith(b'interpretation('):
+                    self.found = True
+                return
+            entry = line
+        else:
+            entry += b' ' + line
+        end = entry.find(b'])')
+        if end == -1:
+            self._entry = entry
+            return
+        self._entry = None
+        # the entry ends at its first '])'; anything after closes the interpretation
+        entry = entry[:end + 2]
+
+        fm = _FUNC_RE.match(entry)
+        if fm:
+            name = fm.group(1).decode()
+            vals = _parse_ints(fm.group(2))
+            self.data['functions'][name] = vals
+            return
+        rm = _REL_RE.match(entry)
+        if rm:
+            name, args, values = rm.groups()
+            # arity from the already isolated argument list, e.g. b'_,_' -> 2
+            arity = args.count(b',') + 1 if args.strip() else 0
+            self.data['relations'][name.decode()] = {'arity': arity, 'values': _parse_ints(values)}
+
+
+def parse_mace_model_output(output):
+    """Parse a Mace4 model output (str or bytes) and return a dict with functions and relations.
+
+    Returns a structure: { 'functions': {name: [ints...]}, 'relations': {name: {'arity':k, 'values':[0/1...]}} }
+    If the output contains no model, returns None.
+    """
+    if isinstance(output, str):
+        output = output.encode()
+    # no interpretation means no model; skip the line walk entirely
+    if b'interpretation(' not in output:
+        return None
+    parser = ModelParser()
+    for line in output.splitlines():
+        parser.feed(line)
+    return parser.model
+
+
+# summarize_model unflattens binary relations in worker processes only when
+# there are at least this many of them and one is this big (and there is more
+# than one CPU); below that, pickling the values and results costs more than
+# the parallel loops save
+_PARALLEL_MIN_RELATIONS = 8
+_PARALLEL_MIN_VALUES = 100_000
+
+
+def _unflatten_binary(vals) -> tuple:
+    """Return (mapping, domain_size) for a flattened binary relation; mapping is row -> [columns that hold]."""
+    # try determine domain size
+    ds = int(round(math.sqrt(len(vals)))) if vals else 0
+    mapping = {}
+    for i in range(ds):
+        row = vals[i * ds:(i + 1) * ds]
+        cols = [j for j, v in enumerate(row) if v]
+        if cols:
+            mapping[i] = cols
+    return mapping, ds
 
 
 def summarize_model(parsed: dict) -> dict:
@@ -87,29 +238,30 @@ def summarize_model(parsed: dict) -> dict:
     Returns {'functions':..., 'relations':...} essentially passed through but grouped.
     """
     # Build inverse map from functions: index -> [names]
-    inv = {}
+    inv = defaultdict(list)
     for name, vals in parsed.get('functions', {}).items():
-        if not vals:
-            continue
-        idx = vals[0]
-        inv.setdefault(idx, []).append(name)
+        if vals:
+            inv[vals[0]].append(name)
 
-    summary = {'by_index': inv, 'relations': {}}
+    summary = {'by_index': dict(inv), 'relations': {}}
     # For binary relations like alive, attempt to produce a readable mapping
-    for rname, info in parsed.get('relations', {}).items():
+    relations = parsed.get('relations', {})
+    binary = [name for name, info in relations.items() if info.get('arity', 0) == 2]
+    binary_vals = [relations[name].get('values', []) for name in binary]
+    cpus = os.cpu_count() or 1
+    if (cpus > 1 and len(binary_vals) >= _PARALLEL_MIN_RELATIONS
+            and any(len(v) > _PARALLEL_MIN_VALUES for v in binary_vals)):
+        # relations are independent, so unflatten them side by side
+        with ProcessPoolExecutor(max_workers=min(len(binary), cpus)) as ex:
+            unflattened = dict(zip(binary, ex.map(_unflatten_binary, binary_vals)))
+    else:
+        unflattened = dict(zip(binary, map(_unflatten_binary, binary_vals)))
+
+    for rname, info in relations.items():
         arity = info.get('arity', 0)
         vals = info.get('values', [])
         if arity == 2:
-            # try determine domain size
-            import math
-            ds = int(round(math.sqrt(len(vals)))) if vals else 0
-            mapping = {}
-            for i in range(ds):
-                for j in range(ds):
-                    idx = i * ds + j
-                    v = vals[idx] if idx < len(vals) else 0
-                    if v:
-                        mapping.setdefault(i, []).append(j)
+            mapping, ds = unflattened[rname]
             summary['relations'][rname] = {'arity': 2, 'mapping': mapping, 'domain_size': ds}
         else:
             summary['relations'][rname] = {'arity': arity, 'values': vals}
@@ -117,63 +269,182 @@ def summarize_model(parsed: dict) -> dict:
     return summary
 
 
-def _collect_constants_from_text(text: str) -> list:
-    import re
-    args = set()
-    # find predicate argument lists and extract tokens that look like constants
-    for m in re.finditer(r"\b[a-z][a-z0-9_]*\s*\(([^)]*)\)", text):
-        inside = m.group(1)
-        for part in inside.split(','):
-            tok = part.strip()
-            # accept lower-case tokens (constants) like a, n0, player1
-            if tok and re.match(r"^[a-z][a-z0-9_]*$", tok):
-                args.add(tok)
-    return sorted(args)
+def relation_holds(parsed: dict, name: str, args) -> bool:
+    """Return whether `name(args...)` is true in a parsed model.
+
+    Each argument must be a constant that appears in the model's functions
+    (e.g. 'n1'); returns False if the relation or any argument is missing.
+    """
+    funcs = parsed.get('functions', {})
+    key = f"{name}({','.join('_' for _ in args)})" if args else name
+    info = parsed.get('relations', {}).get(key)
+    if not info:
+        return False
+    vals = info.get('values', [])
+    arity = len(args)
+    ds = int(round(len(vals) ** (1.0 / arity))) if arity and vals else 0
+    idx = 0
+    for a in args:
+        a_vals = funcs.get(a)
+        if not a_vals:
+            return False
+        idx = idx * ds + a_vals[0]
+    return idx < len(vals) and bool(vals[idx])
+
+
+@functools.lru_cache(maxsize=16)
+def _collect_constants_from_text(text: str) -> tuple:
+    # find predicate argument lists and keep the tokens that look like
+    # constants (lower-case, e.g. a, n0, player1)
+    args = {tok for m in _PRED_RE.finditer(text)
+            for tok in map(str.strip, m.group(1).split(','))
+            if _CONST_RE.match(tok)}
+    return tuple(sorted(args))
+
+
+@functools.lru_cache(maxsize=32)
+def _scan_base(text: str):
+    """Return (encoded text, byte offset of the query insert point) for a `.in` text.
+
+    The offset is None if the text has no assumptions block.
+    """
+    data = text.encode()
+    try:
+        insert_pos = _assumptions_end(text)
+    except ValueError:
+        return data, None
+    if not text.isascii():
+        insert_pos = len(text[:insert_pos].encode())
+    return data, insert_pos
+
+
+class PreparedInput:
+    """A `.in` file read and encoded once, with its query offset found, for repeated queries."""
+
+    def __init__(self, path: Path, text: str):
+        self.path = path
+        self.text = text
+        self.data, self.insert_pos = _scan_base(text)
+
+    @property
+    def consts(self) -> tuple:
+        # only needed for max_domain, so the file is scanned on first use
+        return _collect_constants_from_text(self.text)
 
 
-def run_query_return(parsed_file: Path, query: str, mace4_cmd: str = 'mace4', max_domain: int = None):
+def prepare(parsed_file: Path) -> PreparedInput:
+    """Read and scan `parsed_file` once; pass the result to run_query_return for each query."""
+    return PreparedInput(parsed_file, parsed_file.read_text())
+
+
+def prepare_text(text: str) -> PreparedInput:
+    """Like prepare(), for `.in` text that is already in memory."""
+    return PreparedInput(None, text)
+
+
+def _build_query_input(prepared: PreparedInput, query: str, max_domain: int = None) -> bytes:
+    """Return the Mace4 input for one query: the prepared text plus the query and any domain block."""
+    # build domain constraint block if requested
+    domain_block = ''
+    if max_domain and max_domain > 0:
+        dom_names = [f'dom{i}' for i in range(max_domain)]
+        # for each constant in file, assert it equals one of the domain constants;
+        # the disjunction is the same for every constant, so build it once
+        line_tmpl = '(' + ' | '.join(f'{{c}} = {d}' for d in dom_names) + ').\n'
+        domain_block = ''.join([
+            '\n% domain constants forced by wrapper\n',
+            ''.join(f'{d}.\n' for d in dom_names),
+            ''.join(line_tmpl.format(c=c) for c in prepared.consts),
+        ])
+
+    insert_pos = prepared.insert_pos
+    if insert_pos is None:
+        _assumptions_end(prepared.text)  # raises the ValueError describing what is missing
+    # the query and domain block both go just before the assumptions' 'end.';
+    # joining memoryview slices copies the cached bytes only once
+    base = memoryview(prepared.data)
+    payload = (_query_line(query) + domain_block).encode()
+    return b''.join((base[:insert_pos], payload, base[insert_pos:]))
+
+
+def run_query_return(parsed_file, query: str, mace4_cmd: str = 'mace4', max_domain: int = None):
     """Insert query into file, optionally add domain constraints, run Mace4, return (rc, stdout, parsed_model).
 
+    parsed_model is None when Mace4 found no model.
+
+    `parsed_file` is either a Path or a handle returned by prepare() or
+    prepare_text(); with a handle the file is not read or scanned again.
+
     If max_domain is set (int), this function will add domain constants dom0..dom{max_domain-1}
     and assert that every constant found in the file equals one of those dom constants, which
     restricts Mace4 to models with at most that many distinct elements.
     """
-    # read file
-    text = parsed_file.read_text()
-    # collect constants from the original file
-    consts = _collect_constants_from_text(text)
+    prepared = parsed_file if isinstance(parsed_file, PreparedInput) else prepare(parsed_file)
+    input_data = _build_query_input(prepared, query, max_domain)
 
-    # build domain constraint block if requested
-    domain_block = ''
-    if max_domain and max_domain > 0:
-        dom_names = [f'dom{i}' for i in range(max_domain)]
-        # declare domain constants
-        domain_block += '\n% domain constants forced by wrapper\n'
-        for d in dom_names:
-            domain_block += f'{d}.\n'
-        # for each constant in file, assert it equals one of the domain constants
-        for c in consts:
-            disj = ' | '.join([f'{c} = {d}' for d in dom_names])
-            domain_block += f'({disj}).\n'
-
-    new_text = insert_query_into_assumptions(text, query)
-    if domain_block:
-        # insert domain_block just before the end. Find the first occurrence of '\nend.\n' after assumptions
-        idx = new_text.find('\nend.\n')
-        if idx != -1:
-            new_text = new_text[:idx] + domain_block + new_text[idx:]
-
-    with tempfile.NamedTemporaryFile('w', suffix='.in', delete=False) as tf:
-        tf.write(new_text)
-        tmpname = tf.name
-
-    rc, out = run_mace4(Path(tmpname), mace4_cmd=mace4_cmd)
-    parsed = {}
-    if rc == 0:
-        parsed = parse_mace_model_output(out)
+    parser = ModelParser()
+    rc, out = run_mace4(mace4_cmd=mace4_cmd, on_line=parser.feed, input_data=input_data)
+    parsed = parser.model if rc == 0 else None
+    return rc, out, parsed
+
+
+def run_queries_batch(parsed_file, queries, mace4_cmd: str = 'mace4', max_domain: int = None, workers: int = None):
+    """Run several queries against the same file, one Mace4 process per query in parallel.
+
+    The file is read and scanned once. Yields (query, rc, parsed_model) tuples
+    in completion order, not in the order of `queries`.
+    """
+    prepared = parsed_file if isinstance(parsed_file, PreparedInput) else prepare(parsed_file)
+    queries = list(queries)
+    if not queries:
+        return
+    # the work is waiting on Mace4 subprocesses, so threads are enough
+    workers = min(len(queries), workers or os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        futures = {ex.submit(run_query_return, prepared, q, mace4_cmd, max_domain): q for q in queries}
+        for fut in as_completed(futures):
+            rc, out, parsed = fut.result()
+            yield futures[fut], rc, parsed
+
+
+async def run_query_async(parsed_file, query: str, mace4_cmd: str = 'mace4', max_domain: int = None):
+    """Coroutine version of run_query_return; returns (rc, stdout, parsed_model)."""
+    prepared = parsed_file if isinstance(parsed_file, PreparedInput) else prepare(parsed_file)
+    input_data = _build_query_input(prepared, query, max_domain)
+    loop = asyncio.get_running_loop()
+
+    # the first call per command runs a probe Mace4, so keep it off the loop
+    if await loop.run_in_executor(None, _accepts_stdin, mace4_cmd):
+        proc = await asyncio.create_subprocess_exec(
+            mace4_cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        out_bytes, _ = await proc.communicate(input_data)
+        rc, out = proc.returncode, out_bytes.decode(errors='replace')
+        parsed = parse_mace_model_output(out_bytes) if rc == 0 else None
+    else:
+        # this build needs -f; run_mace4 handles the temporary file on a worker thread
+        rc, out = await loop.run_in_executor(
+            None, functools.partial(run_mace4, mace4_cmd=mace4_cmd, input_data=input_data))
+        parsed = parse_mace_model_output(out) if rc == 0 else None
     return rc, out, parsed
 
 
+async def run_queries_async(parsed_file, queries, mace4_cmd: str = 'mace4', max_domain: int = None, workers: int = None):
+    """Run several queries with at most `workers` Mace4 processes at once.
+
+    While Mace4 runs for some queries the event loop builds the input of the
+    next ones. Returns a list of (query, rc, parsed_model) in query order.
+    """
+    prepared = parsed_file if isinstance(parsed_file, PreparedInput) else prepare(parsed_file)
+    sem = asyncio.Semaphore(workers or os.cpu_count() or 1)
+
+    async def one(query):
+        async with sem:
+            rc, out, parsed = await run_query_async(prepared, query, mace4_cmd, max_domain)
+        return query, rc, parsed
+
+    return await asyncio.gather(*(one(q) for q in queries))
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('--file', '-f', required=True, help='Path to a Prover9/Mace4 .in file')
@@ -198,12 +469,8 @@ def main():
         print('Error while preparing file:', e)
         sys.exit(2)
 
-    with tempfile.NamedTemporaryFile('w', suffix='.in', delete=False) as tf:
-        tf.write(new_text)
-        tmpname = tf.name
-
-    print(f'Running Mace4 on temporary file: {tmpname}\n(looking for a model that satisfies the augmented assumptions)')
-    rc = run_mace4(Path(tmpname), mace4_cmd=mace4_path)
+    print(f'Running Mace4 on {p} with the query added\n(looking for a model that satisfies the augmented assumptions)')
+    rc, _ = run_mace4(mace4_cmd=mace4_path, input_data=new_text.encode(), on_line=lambda line: print(line.decode(errors='replace'), end=''))
     if rc == 0:
         print('\nMace4 exited with code 0. Check above for model output (if any).')
     else:
@@ -0,0 +1,104 @@
+import json
+import os
+import stat
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import scripts.check_win_prover9 as cw
+import scripts.mace4_query as mq
+
+# Stand-in for mace4 on PATH: logs the query inserted at the end of the
+# assumptions and prints the model models.json gives for it, if any.
+FAKE_MACE4 = '''#!{python}
+import json, os, sys
+here = os.path.dirname(os.path.abspath(__file__))
+lines = sys.stdin.read().splitlines()
+# the query is appended to the last assumption, a win axiom ending in ' ).'
+query = lines[lines.index('end.') - 2].split(' ).')[-1]
+with open(os.path.join(here, 'queries.log'), 'a') as log:
+    log.write(query + '\\n')
+with open(os.path.join(here, 'models.json')) as f:
+    model = json.load(f).get(query)
+if model is None:
+    print('exit (exhausted)')
+    sys.exit(2)
+print(model)
+'''
+
+# a model where villagersWin(n1) holds and mafiaWin(n1) does not
+VILLAGERS_MODEL = """interpretation( 2, [number=1, seconds=0], [
+        function(n1, [ 1 ]),
+        relation(mafiaWin(_), [ 0, 0 ]),
+        relation(villagersWin(_), [ 0, 1 ])])."""
+
+DISJUNCTION = 'villagersWin(n1) | mafiaWin(n1).'
+
+STATE = {
+    'players': ['a', 'b', 'c'],
+    'roles': {'a': 'mafia', 'b': 'doctor', 'c': 'villager'},
+    'alive': ['a', 'b', 'c'],
+    'time': 'n1',
+    'force_solver': True,
+}
+
+
+class CheckStateTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        mace4 = self.dir / 'mace4'
+        mace4.write_text(FAKE_MACE4.format(python=sys.executable))
+        mace4.chmod(mace4.stat().st_mode | stat.S_IXUSR)
+        path = self.dir.as_posix() + os.pathsep + os.environ.get('PATH', '')
+        patches = [
+            mock.patch.dict(os.environ, {'PATH': path}),
+            # the fake reads stdin; skip the probe run
+            mock.patch.dict(mq._MACE4_ACCEPTS_STDIN, {'mace4': True}),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def set_models(self, models):
+        (self.dir / 'models.json').write_text(json.dumps(models))
+
+    def queries_run(self):
+        log = self.dir / 'queries.log'
+        return log.read_text().splitlines() if log.exists() else []
+
+    def test_decided_from_alive_counts(self):
+        self.set_models({})
+        res = cw.check_state({**STATE, 'alive': ['b', 'c']})
+        self.assertEqual((res['villagers'], res['mafia'], res['results']), (True, False, {}))
+        self.assertEqual(self.queries_run(), [])
+
+    def test_model_decides_one_predicate(self):
+        # the disjunction's model shows villagersWin; only mafiaWin is rechecked
+        self.set_models({DISJUNCTION: VILLAGERS_MODEL})
+        res = cw.check_state(STATE)
+        self.assertTrue(res['villagers'])
+        self.assertFalse(res['mafia'])
+        self.assertEqual(res['results'], {'villagersWin(n1)': (0, True), 'mafiaWin(n1)': (2, False)})
+        self.assertEqual(self.queries_run(), [DISJUNCTION, 'mafiaWin(n1).'])
+
+    def test_no_model(self):
+        # neither goal can hold, so the single disjunction run settles both
+        self.set_models({})
+        res = cw.check_state(STATE)
+        self.assertFalse(res['villagers'])
+        self.assertFalse(res['mafia'])
+        self.assertEqual(res['results'], {'villagersWin(n1)': (2, False), 'mafiaWin(n1)': (2, False)})
+        self.assertEqual(self.queries_run(), [DISJUNCTION])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from scripts.generate_prover9 import build_in_text
+
+# two nights; a is voted out on day 0, day 1 ends in a tie
+SCENARIO = {
+    'players': ['a', 'b', 'c', 'd'],
+    'roles': {'a': 'mafia', 'b': 'doctor', 'c': 'cop', 'd': 'villager'},
+    'nights': 2,
+    'night_actions': {'0': [{'type': 'kill', 'by': 'a', 'target': 'd'},
+                            {'type': 'protect', 'by': 'b', 'target': 'd'},
+                            {'type': 'investigate', 'by': 'c', 'target': 'a'}]},
+    'day_votes': {'0': [{'voter': 'b', 'target': 'a'}, {'voter': 'c', 'target': 'a'},
+                        {'voter': 'a', 'target': 'c'}],
+                  '1': [{'voter': 'b', 'target': 'c'}, {'voter': 'c', 'target': 'b'}]},
+}
+
+EXPECTED = """% Auto-generated Prover9 input: multi-night Mafia example
+% Nights: 2
+
+formulas(assumptions).
+isMafia(a).
+isDoctor(b).
+isCop(c).
+isVillager(d).
+
+% time constant
+% n0
+% time constant
+% n1
+% time constant
+% n2
+
+next(n0) = n1.
+next(n1) = n2.
+
+alive(a,n0).
+alive(b,n0).
+alive(c,n0).
+alive(d,n0).
+
+kill(a,d,n0).
+protect(b,d,n0).
+investigate(c,a,n0).
+
+
+% elimination by vote on day 0
+eliminated(a,n1).
+-alive(a,n1).
+
+% Axioms
+all D all Y all N ( protect(D,Y,N) -> protected(Y,N) ).
+all X all Y all N ( kill(X,Y,N) & -protected(Y,N) -> -alive(Y,next(N)) ).
+all C all T all N ( isCop(C) & isMafia(T) & investigate(C,T,N) -> recognizes(C,T) ).
+
+% Villagers win: no mafia alive at time N
+all N ( ( all P ( isMafia(P) -> -alive(P,N) ) ) -> villagersWin(N) ).
+% Mafia win: all alive players are mafia at time N (sufficient condition)
+all N ( ( all P ( -alive(P,N) -> isMafia(P) ) ) -> mafiaWin(N) ).
+end.
+
+formulas(goals).
+% Add goals here, e.g. -Alive(e,n1) or Recognizes(c,a).
+end.
+"""
+
+
+class BuildInTextTest(unittest.TestCase):
+
+    def test_small_scenario(self):
+        self.assertEqual(build_in_text(SCENARIO), EXPECTED)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from scripts.gui_generator import vote_leader
+
+
+def votes(*targets):
+    return [{'voter': f'v{i}', 'target': t} for i, t in enumerate(targets)]
+
+
+class VoteLeaderTest(unittest.TestCase):
+
+    def test_unique_leader(self):
+        self.assertEqual(vote_leader(votes('a', 'b', 'a')), 'a')
+
+    def test_single_vote(self):
+        self.assertEqual(vote_leader(votes('c')), 'c')
+
+    def test_tie_for_the_lead(self):
+        self.assertIsNone(vote_leader(votes('a', 'b')))
+        self.assertIsNone(vote_leader(votes('a', 'b', 'b', 'c', 'a')))
+
+    def test_tie_below_the_lead(self):
+        self.assertEqual(vote_leader(votes('a', 'b', 'c', 'a')), 'a')
+
+
+if __name__ == '__main__':
+    unittest.main()
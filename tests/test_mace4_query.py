@@ -0,0 +1,138 @@
+import stat
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import scripts.mace4_query as mq
+
+# Stand-in for mace4: reads the input from -f or stdin and prints a one-model
+# interpretation only if the input looks like a Prover9 file.
+FAKE_MACE4 = '''#!{python}
+import sys
+args = sys.argv[1:]
+text = open(args[args.index('-f') + 1]).read() if '-f' in args else sys.stdin.read()
+if 'formulas(assumptions).' not in text:
+    print('ERROR: no assumptions')
+    sys.exit(2)
+print("""interpretation( 2, [number=1, seconds=0], [
+        function(a, [ 0 ]),
+        relation(alive(_,_), [
+			   0, 1,
+			   1, 0 ])]).""")
+'''
+
+IN_TEXT = 'formulas(assumptions).\nalive(a,n0).\nend.\n'
+
+
+class RunMace4Test(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        tmp = Path(self.tmp.name)
+        self.mace4 = tmp / 'mace4'
+        self.mace4.write_text(FAKE_MACE4.format(python=sys.executable))
+        self.mace4.chmod(self.mace4.stat().st_mode | stat.S_IXUSR)
+        self.infile = tmp / 'example.in'
+        self.infile.write_text(IN_TEXT)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def assert_model(self, rc, out):
+        self.assertEqual(rc, 0, out)
+        parsed = mq.parse_mace_model_output(out)
+        self.assertEqual(parsed['functions'], {'a': [0]})
+        self.assertEqual(parsed['relations']['alive(_,_)']['values'], [0, 1, 1, 0])
+
+    def test_str_path_is_read_as_a_file(self):
+        self.assert_model(*mq.run_mace4(str(self.infile), mace4_cmd=str(self.mace4)))
+
+    def test_pathlike_path(self):
+        self.assert_model(*mq.run_mace4(self.infile, mace4_cmd=str(self.mace4)))
+
+    def test_input_data(self):
+        self.assert_model(*mq.run_mace4(mace4_cmd=str(self.mace4), input_data=IN_TEXT.encode()))
+
+    def test_needs_exactly_one_source(self):
+        with self.assertRaises(ValueError):
+            mq.run_mace4(mace4_cmd=str(self.mace4))
+        with self.assertRaises(ValueError):
+            mq.run_mace4(self.infile, mace4_cmd=str(self.mace4), input_data=b'')
+
+    def test_run_query_return(self):
+        rc, out, parsed = mq.run_query_return(self.infile, 'alive(a,n0)', mace4_cmd=str(self.mace4))
+        self.assertEqual(rc, 0, out)
+        self.assertEqual(parsed['functions'], {'a': [0]})
+
+
+# Mace4 prints the last entry and the interpretation's closing '])' on one line
+MODEL_CLOSED_INLINE = """============================== MODEL =================================
+
+interpretation( 3, [number=1, seconds=0], [
+
+        function(a, [ 0 ]),
+
+        function(n1, [ 2 ]),
+
+        relation(alive(_,_), [
+			   0, 0, 1,
+			   1, 0, 0,
+			   0, 1, 0 ]),
+
+        relation(mafiaWin(_), [ 0, 0, 1 ])]).
+
+============================== end of model ==========================
+"""
+
+# the same model with ']).' on a line of its own
+MODEL_CLOSED_APART = MODEL_CLOSED_INLINE.replace(' ])]).', ' ])\n]).')
+
+
+class ParseModelTest(unittest.TestCase):
+
+    def assert_parsed(self, parsed):
+        self.assertEqual(parsed['functions'], {'a': [0], 'n1': [2]})
+        self.assertEqual(parsed['relations'], {
+            'alive(_,_)': {'arity': 2, 'values': [0, 0, 1, 1, 0, 0, 0, 1, 0]},
+            'mafiaWin(_)': {'arity': 1, 'values': [0, 0, 1]},
+        })
+
+    def test_last_entry_closed_on_same_line(self):
+        self.assert_parsed(mq.parse_mace_model_output(MODEL_CLOSED_INLINE))
+
+    def test_last_entry_closed_on_own_line(self):
+        self.assert_parsed(mq.parse_mace_model_output(MODEL_CLOSED_APART))
+
+    def test_multiline_binary_relation(self):
+        parsed = mq.parse_mace_model_output(MODEL_CLOSED_INLINE)
+        self.assertTrue(mq.relation_holds(parsed, 'alive', ['a', 'n1']))
+        self.assertFalse(mq.relation_holds(parsed, 'alive', ['n1', 'n1']))
+        summary = mq.summarize_model(parsed)
+        self.assertEqual(summary['relations']['alive(_,_)'],
+                         {'arity': 2, 'mapping': {0: [2], 1: [0], 2: [1]}, 'domain_size': 3})
+
+    def test_model_parser_fed_line_by_line(self):
+        parser = mq.ModelParser()
+        lines = MODEL_CLOSED_INLINE.encode().splitlines(keepends=True)
+        for line in lines[:2]:
+            parser.feed(line)
+        self.assertIsNone(parser.model)
+        for line in lines[2:]:
+            parser.feed(line)
+        self.assertTrue(parser.found)
+        self.assert_parsed(parser.model)
+        self.assertTrue(mq.relation_holds(parser.model, 'mafiaWin', ['n1']))
+        self.assertFalse(mq.relation_holds(parser.model, 'mafiaWin', ['a']))
+
+    def test_bytes_output(self):
+        self.assert_parsed(mq.parse_mace_model_output(MODEL_CLOSED_INLINE.encode()))
+
+    def test_no_model(self):
+        self.assertIsNone(mq.parse_mace_model_output('exit (exhausted)\n'))
+
+
+if __name__ == '__main__':
+    unittest.main()